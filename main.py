@@ -5,24 +5,29 @@ from modern_talking.data import download_kpa_2021_data
 from modern_talking.evaluation import Metric
 from modern_talking.evaluation.f_measure import F1Score, MacroF1Score
 from modern_talking.evaluation.manual_errors import ManualErrors
-from modern_talking.evaluation.map import MeanAveragePrecision
+from modern_talking.evaluation.map import MeanAveragePrecision, \
+    IncrementalMeanAveragePrecision
 from modern_talking.evaluation.precision import Precision, MacroPrecision
 from modern_talking.evaluation.recall import Recall, MacroRecall
+from modern_talking.evaluation.threshold import BestF1Score
 from modern_talking.matchers import Matcher
 from modern_talking.matchers.baselines import AllMatcher, RandomMatcher, \
     NoneMatcher
 from modern_talking.matchers.bert import BertMatcher
+from modern_talking.matchers.bi_encoder import BiEncoderMatcher
 from modern_talking.matchers.bilstm import BidirectionalLstmMatcher
-from modern_talking.matchers.combine import Cascade
+from modern_talking.matchers.combine import Cascade, RetrieveRerank
 from modern_talking.matchers.distillbert_bilstm import MergeType, \
     DistilBertBilstmMatcher
 from modern_talking.matchers.regression import EnsembleVotingMatcher, \
     RegressionTfidfMatcher, RegressionBagOfWordsMatcher, \
     EnsemblePartOfSpeechMatcher, RegressionPartOfSpeechMatcher, \
-    SVCPartOfSpeechMatcher, SVCBagOfWordsMatcher, SimpleTransformMatcher
+    SVCPartOfSpeechMatcher, SVCBagOfWordsMatcher, SimpleTransformMatcher, \
+    StreamingRegressionMatcher, SvmType
+from modern_talking.matchers.term_index import TermWeighting
 from modern_talking.matchers.term_overlap import TermOverlapMatcher
 from modern_talking.matchers.transformers import TransformersMatcher
-from modern_talking.pipeline import Pipeline
+from modern_talking.pipeline import Pipeline, data_dir
 
 matchers: Iterable[Matcher] = [
     AllMatcher(),
@@ -48,9 +53,22 @@ matchers: Iterable[Matcher] = [
     RegressionTfidfMatcher(),
     RegressionPartOfSpeechMatcher(),
     EnsembleVotingMatcher(),
+    EnsembleVotingMatcher(svm=SvmType.linear),
+    EnsembleVotingMatcher(svm=SvmType.nystroem),
     EnsemblePartOfSpeechMatcher(),
+    EnsemblePartOfSpeechMatcher(svm=SvmType.linear),
+    EnsemblePartOfSpeechMatcher(svm=SvmType.nystroem),
     SVCPartOfSpeechMatcher(),
+    SVCPartOfSpeechMatcher(svm=SvmType.linear),
+    SVCPartOfSpeechMatcher(svm=SvmType.nystroem),
     SVCBagOfWordsMatcher(),
+    SVCBagOfWordsMatcher(svm=SvmType.linear),
+    SVCBagOfWordsMatcher(svm=SvmType.nystroem),
+    StreamingRegressionMatcher(labels_file=data_dir / "labels_train.csv"),
+    StreamingRegressionMatcher(
+        epochs=5,
+        labels_file=data_dir / "labels_train.csv",
+    ),
     BidirectionalLstmMatcher(
         units=32,
         max_length=512,
@@ -147,6 +165,26 @@ matchers: Iterable[Matcher] = [
         "distilbert",
         "distilbert-base-uncased",
     ),
+    BiEncoderMatcher("distilbert-base-uncased"),
+    BiEncoderMatcher("bert-base-uncased", epochs=3),
+    RetrieveRerank(
+        TermOverlapMatcher(
+            stemming=True,
+            stop_words=True,
+            weighting=TermWeighting.tfidf,
+        ),
+        TransformersMatcher(
+            "bert",
+            "bert-base-uncased",
+        ),
+    ),
+    RetrieveRerank(
+        BiEncoderMatcher("distilbert-base-uncased"),
+        TransformersMatcher(
+            "bert",
+            "bert-base-uncased",
+        ),
+    ),
 ]
 
 metrics: Iterable[Metric] = [
@@ -156,8 +194,10 @@ metrics: Iterable[Metric] = [
     MacroRecall(),
     F1Score(),
     MacroF1Score(),
+    BestF1Score(),
     MeanAveragePrecision(),
     MeanAveragePrecision(new=True),
+    IncrementalMeanAveragePrecision(),
     ManualErrors(),
 ]
 
@@ -1,8 +1,20 @@
 from abc import abstractmethod, ABC
 from enum import Enum
-from typing import Tuple, Set, List
+from pathlib import Path
+from typing import Tuple, Set, List, Dict, Any, Callable, Optional, \
+    TypeVar
 
-from modern_talking.model import Labels, KeyPointId, ArgumentId
+from modern_talking.model import Labels, KeyPointId, ArgumentId, DatasetType
+
+
+_T = TypeVar("_T")
+
+# Process-level cache of data loaded from files, by loader name and files.
+# Each entry stores the files' modification times to detect changes.
+_file_cache: Dict[
+    Tuple[str, Tuple[Path, ...]],
+    Tuple[Tuple[Optional[int], ...], Any]
+] = {}
 
 
 class EvaluationMode(Enum):
@@ -10,6 +22,47 @@ class EvaluationMode(Enum):
     relaxed = 2
 
 
+def detect_dataset_type(ground_truth_labels: Labels) -> DatasetType:
+    """
+    Detect the KPA 2021 dataset from the number of ground truth labels.
+    """
+    labels_count = len(ground_truth_labels)
+    if labels_count == 20635:
+        return DatasetType.TRAIN
+    elif labels_count == 3458:
+        return DatasetType.DEV
+    elif labels_count == 3426:
+        return DatasetType.TEST
+    else:
+        raise Exception(f"Can't detect data subset "
+                        f"from label count {labels_count}.")
+
+
+def load_cached(
+        name: str,
+        files: Tuple[Path, ...],
+        load: Callable[[], _T],
+) -> _T:
+    """
+    Load data from the given files, or return the data loaded before
+    in this process if none of the files' modification times changed.
+    :param name: Name of the loader, to distinguish different data
+    loaded from the same files.
+    :param load: Function loading the data if it isn't cached yet.
+    """
+    modification_times = tuple(
+        file.stat().st_mtime_ns if file.exists() else None
+        for file in files
+    )
+    key = (name, files)
+    cached = _file_cache.get(key)
+    if cached is not None and cached[0] == modification_times:
+        return cached[1]
+    data = load()
+    _file_cache[key] = (modification_times, data)
+    return data
+
+
 class Metric(ABC):
     """
     Evaluation metric for comparing predicted match labels
@@ -60,8 +113,10 @@ class Metric(ABC):
     ) -> Tuple[List[int], List[int]]:
         """
         Return true and predicted labels as 0 (no match), 1 (match).
-        Missing ground truth labels are filled
-        with the corresponding predicted label.
+        Missing ground truth labels are resolved
+        according to the evaluation mode.
+        Missing predicted labels are treated as no match,
+        e.g., for matchers that only predict candidate pairs.
         """
 
         ids = Metric.get_all_ids(predicted_labels, ground_truth_labels)
@@ -71,7 +126,7 @@ class Metric(ABC):
             for arg, kp in ids
         ]
         y_pred = [
-            1 if predicted_labels[arg, kp] >= 0.5 else 0
+            1 if predicted_labels.get((arg, kp), 0) >= 0.5 else 0
             for arg, kp in ids
         ]
         return y_true, y_pred
@@ -1,42 +1,199 @@
-from itertools import islice
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from heapq import heappush, heappushpop
+from math import fsum
+from typing import List, Tuple, Dict, Optional
 
-from modern_talking.evaluation import Metric, EvaluationMode
-from modern_talking.model import Labels, ArgumentKeyPointIdPair, Label
+from modern_talking.evaluation import Metric, EvaluationMode, \
+    detect_dataset_type, load_cached
+from modern_talking.model import Labels, Label, Dataset, Topic, \
+    ArgumentId, KeyPointId, ArgumentKeyPointIdPair
+
+
+@dataclass(frozen=True)
+class ManualError:
+    """
+    Absolute error of a single argument key point pair's predicted label.
+    """
+    error: float
+    argument_id: ArgumentId
+    key_point_id: KeyPointId
+    true_label: Label
+    predicted_label: Label
+
+
+@dataclass
+class TopicErrors:
+    """
+    Aggregated errors of all argument key point pairs of a topic.
+    Errors are summed exactly, as non-overlapping partial sums,
+    such that the sum doesn't depend on the order of the pairs.
+    """
+    pairs: int = 0
+    misclassified: int = 0
+    error_partials: List[float] = field(default_factory=list)
+
+    def add_error(self, error: float):
+        # Shewchuk's algorithm, as used by math.fsum.
+        partials = self.error_partials
+        i = 0
+        for partial in partials:
+            if abs(error) < abs(partial):
+                error, partial = partial, error
+            high = error + partial
+            low = partial - (high - error)
+            if low != 0:
+                partials[i] = low
+                i += 1
+            error = high
+        partials[i:] = [error]
+
+    @property
+    def error_sum(self) -> float:
+        return fsum(self.error_partials)
+
+    @property
+    def mean_error(self) -> float:
+        return self.error_sum / self.pairs if self.pairs > 0 else 0
 
 
 class ManualErrors(Metric):
+    """
+    Report the worst predicted argument key point pairs for manual
+    error analysis, along with a per-topic error breakdown.
+    The worst pairs are selected with a bounded heap in O(n log N),
+    for n pairs and N reported errors.
+    The returned score is the mean absolute error over all pairs.
+    """
+
+    count: int
+
+    def __init__(self, count: int = 5):
+        self.count = count
 
     @property
     def slug(self) -> str:
         return "manual-errors"
 
-    def evaluate(
+    @staticmethod
+    def _load_dataset(ground_truth_labels: Labels) -> Optional[Dataset]:
+        # Import here to avoid circular import.
+        from modern_talking.pipeline import Pipeline, data_dir
+
+        try:
+            dataset_type = detect_dataset_type(ground_truth_labels)
+        except Exception:
+            return None
+        subset = dataset_type.name.lower()
+        files = (
+            data_dir / f"arguments_{subset}.csv",
+            data_dir / f"key_points_{subset}.csv",
+            data_dir / f"labels_{subset}.csv",
+        )
+        return load_cached(
+            "dataset",
+            files,
+            lambda: Pipeline.load_dataset(dataset_type),
+        )
+
+    def worst_errors(
             self,
             predicted_labels: Labels,
             ground_truth_labels: Labels,
             mode: EvaluationMode,
-    ) -> float:
+            topics: Dict[ArgumentId, Topic],
+    ) -> Tuple[List[ManualError], Dict[Topic, TopicErrors]]:
+        """
+        Stream over all pairs once, keeping only the worst errors
+        in a bounded min-heap and aggregating errors per topic.
+        Missing predictions count as no match.
+        Ties are broken by pair IDs, and errors are summed exactly,
+        such that results don't depend on the order of the labels.
+        :return: The worst errors, ordered by descending error,
+        and errors aggregated by topic.
+        """
         ids = Metric.get_all_ids(predicted_labels, ground_truth_labels)
         missing = 1 if mode == EvaluationMode.relaxed else 0
-        samples: List[Tuple[ArgumentKeyPointIdPair, Label, Label, float]] = []
+        heap: List[Tuple[float, ArgumentKeyPointIdPair, Label, Label]] = []
+        topic_errors: Dict[Topic, TopicErrors] = {}
         for arg, kp in ids:
             true_label = ground_truth_labels.get((arg, kp), missing)
-            pred_label = predicted_labels[arg, kp]
+            pred_label = predicted_labels.get((arg, kp), 0)
             error = abs(true_label - pred_label)
-            samples.append(((arg, kp), true_label, pred_label, error))
-        samples = list(sorted(
-            samples,
-            key=lambda sample: sample[3],
-            reverse=True,
-        ))
-        max_count = 5
-        if len(samples) > max_count:
-            print(f"Showing only worst {max_count} pairs.")
-        for (arg_kp, true_label, pred_label, error) \
-                in islice(samples, max_count):
-            arg, kp = arg_kp
+
+            sample = (error, (arg, kp), true_label, pred_label)
+            if len(heap) < self.count:
+                heappush(heap, sample)
+            elif sample[:2] > heap[0][:2]:
+                heappushpop(heap, sample)
+
+            topic = topics.get(arg)
+            if topic not in topic_errors:
+                topic_errors[topic] = TopicErrors()
+            errors = topic_errors[topic]
+            errors.pairs += 1
+            errors.add_error(error)
+            if (true_label >= 0.5) != (pred_label >= 0.5):
+                errors.misclassified += 1
+
+        worst = [
+            ManualError(error, arg, kp, true_label, pred_label)
+            for error, (arg, kp), true_label, pred_label
+            in sorted(heap, reverse=True)
+        ]
+        return worst, topic_errors
+
+    def evaluate(
+            self,
+            predicted_labels: Labels,
+            ground_truth_labels: Labels,
+            mode: EvaluationMode,
+    ) -> float:
+        data = ManualErrors._load_dataset(ground_truth_labels)
+        arg_texts: Dict[ArgumentId, str] = {}
+        kp_texts: Dict[KeyPointId, str] = {}
+        topics: Dict[ArgumentId, Topic] = {}
+        if data is not None:
+            arg_texts = {arg.id: arg.text for arg in data.arguments}
+            kp_texts = {kp.id: kp.text for kp in data.key_points}
+            topics = {arg.id: arg.topic for arg in data.arguments}
+
+        worst, topic_errors = self.worst_errors(
+            predicted_labels,
+            ground_truth_labels,
+            mode,
+            topics,
+        )
+
+        pairs = sum(errors.pairs for errors in topic_errors.values())
+        if pairs > self.count:
+            print(f"Showing only worst {self.count} pairs.")
+        for error in worst:
             print(
-                f"Error {error} for {arg} and {kp} "
-                f"(predicted: {pred_label}, true: {true_label})")
-        return -1
+                f"Error {error.error} for {error.argument_id} "
+                f"and {error.key_point_id} "
+                f"(predicted: {error.predicted_label}, "
+                f"true: {error.true_label})")
+            if error.argument_id in arg_texts:
+                print(f"\tArgument: {arg_texts[error.argument_id]}")
+            if error.key_point_id in kp_texts:
+                print(f"\tKey point: {kp_texts[error.key_point_id]}")
+
+        if data is not None:
+            print("Errors per topic:")
+            for topic, errors in sorted(
+                    topic_errors.items(),
+                    key=lambda item: item[1].mean_error,
+                    reverse=True,
+            ):
+                print(f"\t{errors.mean_error:.3f} mean error, "
+                      f"{errors.misclassified}/{errors.pairs} misclassified "
+                      f"for topic '{topic}'")
+
+        if pairs == 0:
+            return 0
+        error_sum = fsum(
+            partial
+            for errors in topic_errors.values()
+            for partial in errors.error_partials
+        )
+        return error_sum / pairs
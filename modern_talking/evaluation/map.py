@@ -1,13 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import redirect_stdout
+from dataclasses import dataclass
 from io import StringIO
+from os import cpu_count
 from pathlib import Path
-from tempfile import TemporaryDirectory
+from typing import Dict, Tuple, List, Set, Optional, FrozenSet
 
-from modern_talking.evaluation import Metric, EvaluationMode
-from modern_talking.evaluation.track_1_kp_matching import \
-    calc_mean_average_precision, get_predictions, load_kpm_data
-from modern_talking.model import Labels
-from modern_talking.pipeline import Pipeline
+from numpy import mean
+from pandas import DataFrame
+
+from modern_talking.evaluation import Metric, EvaluationMode, \
+    detect_dataset_type, load_cached
+from modern_talking.evaluation.track_1_kp_matching import load_kpm_data, \
+    get_ap
+from modern_talking.model import Labels, ArgumentId, KeyPointId, Topic, \
+    Stance, ArgumentKeyPointIdPair, Label
+
+_gold_data_dir = Path(__file__).parent.parent.parent / "data"
+
+# Key point ID used by the shared task evaluation
+# for arguments without any predicted key point.
+_DUMMY_KEY_POINT_ID = "dummy_id"
+
+# Type alias for a group of arguments and key points
+# with the same topic and stance.
+Group = Tuple[Topic, Stance]
+
+
+@dataclass(frozen=True)
+class GoldData:
+    """
+    Parsed ground truth data of a shared task subset,
+    pre-merged for evaluating predictions.
+    """
+    key_point_ids: FrozenSet[KeyPointId]
+    labels: Dict[ArgumentKeyPointIdPair, Label]
+    # Argument IDs grouped by topic and stance,
+    # in the order of the shared task evaluation.
+    groups: List[Tuple[Group, List[ArgumentId]]]
+
+
+def load_gold_data(gold_data_dir: Path, subset: str) -> GoldData:
+    """
+    Load and pre-merge arguments, key points, and ground truth labels
+    from the data directory.
+    Gold data is cached per process, keyed by the data files' paths
+    and modification times, such that repeated evaluations
+    don't parse the files again.
+    """
+    files = (
+        gold_data_dir / f"arguments_{subset}.csv",
+        gold_data_dir / f"key_points_{subset}.csv",
+        gold_data_dir / f"labels_{subset}.csv",
+    )
+    return load_cached(
+        "gold-data",
+        files,
+        lambda: _parse_gold_data(gold_data_dir, subset),
+    )
+
+
+def _parse_gold_data(gold_data_dir: Path, subset: str) -> GoldData:
+    with redirect_stdout(StringIO()):
+        arg_df, kp_df, labels_df = load_kpm_data(
+            gold_data_dir,
+            subset=subset
+        )
+    return GoldData(
+        key_point_ids=frozenset(kp_df["key_point_id"]),
+        labels={
+            (arg, kp): label
+            for arg, kp, label in zip(
+                labels_df["arg_id"],
+                labels_df["key_point_id"],
+                labels_df["label"],
+            )
+        },
+        groups=[
+            (group, list(group_df["arg_id"]))
+            for group, group_df in arg_df.groupby(["topic", "stance"])
+        ],
+    )
 
 
 class MeanAveragePrecision(Metric):
@@ -32,36 +105,242 @@ class MeanAveragePrecision(Metric):
         else:
             field = "label_strict"
 
-        labels_count = len(ground_truth_labels)
-        if labels_count == 20635:
-            subset = "train"
-        elif labels_count == 3458:
-            subset = "dev"
-        elif labels_count == 3426:
-            subset = "test"
+        subset = detect_dataset_type(ground_truth_labels).name.lower()
+        gold_data = load_gold_data(_gold_data_dir, subset)
+
+        best_key_points = _best_key_points(
+            predicted_labels,
+            gold_data.key_point_ids,
+        )
+        precisions = [
+            _group_average_precision(
+                arg_ids,
+                best_key_points,
+                gold_data.labels,
+                field,
+            )
+            for _, arg_ids in gold_data.groups
+        ]
+        return mean(precisions)
+
+
+def _best_key_points(
+        predicted_labels: Labels,
+        key_point_ids: Set[KeyPointId],
+) -> Dict[ArgumentId, Tuple[KeyPointId, float]]:
+    """
+    Select the best-scored known key point for each argument,
+    exactly like the shared task evaluation does on exported predictions:
+    on ties, the key point with the lowest ID is selected.
+    """
+    best: Dict[ArgumentId, Tuple[KeyPointId, float]] = {}
+    for (arg, kp), score in predicted_labels.items():
+        if kp not in key_point_ids:
+            continue
+        score = float(score)
+        current = best.get(arg)
+        if (current is None
+                or score > current[1]
+                or (score == current[1] and kp < current[0])):
+            best[arg] = (kp, score)
+    return best
+
+
+def _group_frame(
+        arg_ids: List[ArgumentId],
+        best_key_points: Dict[ArgumentId, Tuple[KeyPointId, float]],
+        labels: Dict[ArgumentKeyPointIdPair, Label],
+) -> DataFrame:
+    """
+    Merge the best-scored key points of a single topic and stance's
+    arguments with the ground truth labels,
+    like the shared task evaluation does.
+    """
+    kp_ids: List[KeyPointId] = []
+    scores: List[float] = []
+    label_values: List[Optional[Label]] = []
+    for arg in arg_ids:
+        kp, score = best_key_points.get(arg, (_DUMMY_KEY_POINT_ID, 0))
+        kp_ids.append(kp)
+        scores.append(score)
+        if kp == _DUMMY_KEY_POINT_ID:
+            label_values.append(0)
         else:
-            raise Exception(f"Can't detect data subset "
-                            f"from label count {labels_count}.")
+            label_values.append(labels.get((arg, kp)))
+    df = DataFrame({
+        "arg_id": arg_ids,
+        "key_point_id": kp_ids,
+        "score": scores,
+        "label": label_values,
+    }, columns=["arg_id", "key_point_id", "score", "label"])
+    df["label"] = df["label"].astype(float)
+    df["label_strict"] = df["label"].fillna(0)
+    df["label_relaxed"] = df["label"].fillna(1)
+    return df
 
-        gold_data_dir = Path(__file__).parent.parent.parent / "data"
 
-        ignore = StringIO()
-        with redirect_stdout(ignore):
-            arg_df, kp_df, labels_df = load_kpm_data(
-                gold_data_dir,
-                subset=subset
-            )
+def _group_average_precision(
+        arg_ids: List[ArgumentId],
+        best_key_points: Dict[ArgumentId, Tuple[KeyPointId, float]],
+        labels: Dict[ArgumentKeyPointIdPair, Label],
+        field: str,
+) -> float:
+    """
+    Calculate the shared task's average precision for the arguments
+    of a single topic and stance.
+    """
+    df = _group_frame(arg_ids, best_key_points, labels)
+    return get_ap(df, field)
 
-        with TemporaryDirectory() as temp_dir:
-            predictions_file = Path(temp_dir) / "predictions.json"
-            Pipeline.save_predictions(predictions_file, predicted_labels)
 
-            with redirect_stdout(ignore):
-                merged_df = get_predictions(
-                    predictions_file,
-                    labels_df,
-                    arg_df,
-                    kp_df
+class IncrementalMeanAveragePrecision(MeanAveragePrecision):
+    """
+    Mean average precision that caches each topic and stance group's
+    average precision together with a hash of the group's predictions.
+    On repeated evaluation, only groups with changed predictions
+    are scored again, e.g., during iterative error analysis.
+    Scores are equal to those of `MeanAveragePrecision`.
+    """
+
+    _cache: Dict[Tuple[str, str, Group], Tuple[int, float]]
+
+    def __init__(self):
+        super().__init__()
+        self._cache = {}
+
+    @property
+    def slug(self) -> str:
+        return "map-incremental"
+
+    def evaluate(
+            self,
+            predicted_labels: Labels,
+            ground_truth_labels: Labels,
+            mode: EvaluationMode,
+    ) -> float:
+        if mode == EvaluationMode.relaxed:
+            field = "label_relaxed"
+        else:
+            field = "label_strict"
+
+        subset = detect_dataset_type(ground_truth_labels).name.lower()
+        gold_data = load_gold_data(_gold_data_dir, subset)
+
+        best_key_points = _best_key_points(
+            predicted_labels,
+            gold_data.key_point_ids,
+        )
+
+        precisions: List[float] = []
+        for group, arg_ids in gold_data.groups:
+            predictions_hash = hash(tuple(
+                best_key_points.get(arg) for arg in arg_ids
+            ))
+            key = (subset, field, group)
+            cached = self._cache.get(key)
+            if cached is None or cached[0] != predictions_hash:
+                precision = _group_average_precision(
+                    arg_ids,
+                    best_key_points,
+                    gold_data.labels,
+                    field,
                 )
-            score = calc_mean_average_precision(merged_df, field)
-            return score
+                cached = (predictions_hash, precision)
+                self._cache[key] = cached
+            precisions.append(cached[1])
+        return mean(precisions)
+
+
+@dataclass(frozen=True)
+class GroupScore:
+    """
+    Evaluation scores of the arguments of a single topic and stance.
+    The match rate is the fraction of arguments
+    whose best-scored key point is a ground truth match.
+    """
+    topic: Topic
+    stance: Stance
+    arguments: int
+    predicted_arguments: int
+    average_precision_strict: float
+    average_precision_relaxed: float
+    match_rate_strict: float
+    match_rate_relaxed: float
+
+
+# Score groups in a process pool if there are at least this many groups.
+_parallel_groups_threshold = 1000
+
+
+def _score_group(
+        group_predictions: Tuple[
+            Group,
+            List[ArgumentId],
+            Dict[ArgumentId, Tuple[KeyPointId, float]],
+            Dict[ArgumentKeyPointIdPair, Label],
+        ]
+) -> GroupScore:
+    (topic, stance), arg_ids, best_key_points, labels = group_predictions
+    df = _group_frame(arg_ids, best_key_points, labels)
+    predicted = df["key_point_id"] != _DUMMY_KEY_POINT_ID
+    return GroupScore(
+        topic=topic,
+        stance=int(stance),
+        arguments=len(df),
+        predicted_arguments=int(predicted.sum()),
+        average_precision_strict=float(get_ap(df, "label_strict")),
+        average_precision_relaxed=float(get_ap(df, "label_relaxed")),
+        match_rate_strict=float(df["label_strict"].mean()),
+        match_rate_relaxed=float(df["label_relaxed"].mean()),
+    )
+
+
+def evaluate_groups(
+        predicted_labels: Labels,
+        ground_truth_labels: Labels,
+        processes: Optional[int] = None,
+) -> List[GroupScore]:
+    """
+    Evaluate average precision, support, and match rate,
+    for each topic and stance, with strict and relaxed labels.
+    Averaging the groups' average precisions yields the mean average
+    precision of `MeanAveragePrecision`.
+    If there are many groups, groups are scored in a process pool.
+    :param processes: Maximum number of worker processes.
+    If None, use as many processes as CPUs are available.
+    """
+    subset = detect_dataset_type(ground_truth_labels).name.lower()
+    gold_data = load_gold_data(_gold_data_dir, subset)
+
+    best_key_points = _best_key_points(
+        predicted_labels,
+        gold_data.key_point_ids,
+    )
+    # Pass only the group's own predictions and labels to workers.
+    group_predictions = []
+    for group, arg_ids in gold_data.groups:
+        group_best_key_points = {
+            arg: best_key_points[arg]
+            for arg in arg_ids
+            if arg in best_key_points
+        }
+        group_labels = {
+            (arg, kp): gold_data.labels[arg, kp]
+            for arg, (kp, _) in group_best_key_points.items()
+            if (arg, kp) in gold_data.labels
+        }
+        group_predictions.append(
+            (group, arg_ids, group_best_key_points, group_labels)
+        )
+
+    if len(group_predictions) < _parallel_groups_threshold:
+        return [_score_group(group) for group in group_predictions]
+    if processes is None:
+        processes = cpu_count() or 1
+    chunk_size = max(1, len(group_predictions) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(
+            _score_group,
+            group_predictions,
+            chunksize=chunk_size,
+        ))
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from typing import List
+
+from numpy import array, argsort, cumsum, diff, where, r_, zeros_like, \
+    divide, errstate
+
+from modern_talking.evaluation import Metric, EvaluationMode
+from modern_talking.model import Labels
+
+
+@dataclass(frozen=True)
+class ThresholdPoint:
+    """
+    Precision, recall, and F1 score when predicting a match
+    for all pairs scored at or above the threshold.
+    """
+    threshold: float
+    precision: float
+    recall: float
+    f1_score: float
+
+
+def precision_recall_curve(
+        predicted_labels: Labels,
+        ground_truth_labels: Labels,
+        mode: EvaluationMode,
+) -> List[ThresholdPoint]:
+    """
+    Compute precision, recall, and F1 score for every distinct
+    predicted score as threshold.
+    Scores are sorted only once, so the whole curve is computed
+    in O(n log n) for n argument key point pairs.
+    Missing ground truth labels are resolved as in
+    `Metric.get_discrete_labels`, missing predictions count as no match.
+    :return: Curve points ordered by descending threshold.
+    """
+    ids = list(Metric.get_all_ids(predicted_labels, ground_truth_labels))
+    if len(ids) == 0:
+        return []
+    missing = 1 if mode == EvaluationMode.relaxed else 0
+    y_true = array([
+        1 if ground_truth_labels.get(arg_kp, missing) >= 0.5 else 0
+        for arg_kp in ids
+    ])
+    y_score = array([
+        predicted_labels.get(arg_kp, 0)
+        for arg_kp in ids
+    ], dtype=float)
+
+    # Sort pairs by descending score.
+    order = argsort(-y_score, kind="mergesort")
+    y_score = y_score[order]
+    y_true = y_true[order]
+
+    # The last pair of each run of equal scores marks a distinct threshold.
+    distinct = r_[where(diff(y_score))[0], y_score.size - 1]
+    true_positives = cumsum(y_true)[distinct]
+    predicted_positives = distinct + 1
+    positives = true_positives[-1]
+
+    with errstate(divide="ignore", invalid="ignore"):
+        precision = true_positives / predicted_positives
+        recall = divide(
+            true_positives, positives,
+            out=zeros_like(precision),
+            where=positives > 0,
+        )
+        f1_score = divide(
+            2 * precision * recall, precision + recall,
+            out=zeros_like(precision),
+            where=(precision + recall) > 0,
+        )
+
+    return [
+        ThresholdPoint(
+            float(threshold),
+            float(point_precision),
+            float(point_recall),
+            float(point_f1_score),
+        )
+        for threshold, point_precision, point_recall, point_f1_score
+        in zip(y_score[distinct], precision, recall, f1_score)
+    ]
+
+
+class BestF1Score(Metric):
+    """
+    F1 score at the threshold that maximizes it,
+    found by sweeping all distinct predicted scores.
+    """
+
+    @property
+    def slug(self) -> str:
+        return "best-f1-score"
+
+    def evaluate(
+            self,
+            predicted_labels: Labels,
+            ground_truth_labels: Labels,
+            mode: EvaluationMode,
+    ) -> float:
+        curve = precision_recall_curve(
+            predicted_labels,
+            ground_truth_labels,
+            mode,
+        )
+        if len(curve) == 0:
+            return 0
+        best = max(curve, key=lambda point: point.f1_score)
+        print(f"Best F1 score {best.f1_score:.3f} "
+              f"at threshold {best.threshold:.3f} "
+              f"(precision: {best.precision:.3f}, "
+              f"recall: {best.recall:.3f}).")
+        return best.f1_score
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from pathlib import Path
-from typing import final, Optional
+from typing import final, Optional, Sequence
 
-from modern_talking.model import Labels, Dataset, LabelledDataset
+from modern_talking.model import Labels, Dataset, LabelledDataset, \
+    ArgumentKeyPointPair
 
 
 class Matcher(ABC):
@@ -94,6 +95,28 @@ class Matcher(ABC):
         """
         pass
 
+    def predict_pairs(
+            self,
+            data: Dataset,
+            pairs: Sequence[ArgumentKeyPointPair],
+    ) -> Labels:
+        """
+        With the trained model, predict match labels only for
+        the given candidate pairs of arguments and key points.
+        The default implementation predicts all pairs and selects
+        the candidates. Expensive matchers should override this method
+        to predict only the candidates.
+        :param data: Dataset that contains the candidate pairs.
+        :param pairs: Candidate pairs of arguments and key points.
+        :return: Dictionary of match labels for the candidate pairs.
+        """
+        labels = self.predict(data)
+        return {
+            (arg.id, kp.id): labels[arg.id, kp.id]
+            for arg, kp in pairs
+            if (arg.id, kp.id) in labels
+        }
+
 
 class LabelPolicy(str, Enum):
     skip = "skip"
@@ -0,0 +1,264 @@
+from pathlib import Path
+from random import Random
+from typing import Dict, List, Optional, Sequence
+
+from numpy import ndarray, clip, stack, zeros
+from torch import Tensor, tensor, cat, float32, no_grad, \
+    device as torch_device
+from torch.cuda import is_available as is_cuda_available
+from torch.nn import Module
+from torch.nn.functional import cosine_similarity, mse_loss
+from torch.optim import AdamW
+from transformers import AutoModel, AutoTokenizer, PreTrainedTokenizerBase, \
+    get_linear_schedule_with_warmup, set_seed
+
+from modern_talking.matchers import Matcher
+from modern_talking.matchers.embeddings import cosine_similarities
+from modern_talking.matchers.regression import labelled_pairs
+from modern_talking.model import Dataset, Labels, LabelledDataset
+
+
+def _mean_pooling(
+        token_embeddings: Tensor,
+        attention_mask: Tensor,
+) -> Tensor:
+    """
+    Average token embeddings, ignoring padding tokens.
+    """
+    mask = attention_mask.unsqueeze(-1).to(token_embeddings.dtype)
+    return (token_embeddings * mask).sum(dim=1) / \
+        mask.sum(dim=1).clamp(min=1e-9)
+
+
+class BiEncoderMatcher(Matcher):
+    """
+    Score argument key point matches by the cosine similarity of
+    independently encoded, mean-pooled transformer embeddings.
+    The encoder is fine-tuned on the labelled pairs by regressing
+    the cosine similarity of each pair towards its label.
+    Each unique argument and key point text is encoded once,
+    key point embeddings are cached,
+    and each topic and stance group is scored with a single matrix product,
+    i.e., A + K instead of A * K transformer passes per group.
+    """
+
+    model_name: str
+    max_sequence_length: int
+    batch_size: int
+    epochs: int
+    learning_rate: float
+    warmup_ratio: float
+    weight_decay: float
+    random_seed: int
+
+    device: torch_device
+    tokenizer: PreTrainedTokenizerBase
+    model: Module = None
+    key_point_embeddings: Dict[str, ndarray]
+
+    def __init__(
+            self,
+            model_name: str = "distilbert-base-uncased",
+            max_sequence_length: int = 128,
+            batch_size: int = 16,
+            epochs: int = 1,
+            learning_rate: float = 2e-5,
+            warmup_ratio: float = 0.1,
+            weight_decay: float = 0.01,
+            random_seed: int = 1234,
+    ):
+        self.model_name = model_name
+        self.max_sequence_length = max_sequence_length
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.warmup_ratio = warmup_ratio
+        self.weight_decay = weight_decay
+        self.random_seed = random_seed
+        self.key_point_embeddings = {}
+
+    @property
+    def slug(self) -> str:
+        weight_decay_suffix = f"-weight-decay-{self.weight_decay}" \
+            if self.weight_decay > 0 else ""
+        warmup_suffix = f"-warmup-{self.warmup_ratio}" \
+            if self.warmup_ratio > 0 else ""
+        return f"bi-encoder" \
+               f"-{self.model_name.replace('/', '-')}" \
+               f"-batch-{self.batch_size}" \
+               f"-epochs-{self.epochs}" \
+               f"-learn-{self.learning_rate}" \
+               f"{weight_decay_suffix}" \
+               f"{warmup_suffix}"
+
+    @property
+    def name(self) -> Optional[str]:
+        return "Bi-encoder"
+
+    @property
+    def description(self) -> Optional[str]:
+        return f"Score matches by the cosine similarity of argument and " \
+               f"key point embeddings from a fine-tuned '{self.model_name}' " \
+               f"Huggingface Transformers model."
+
+    def prepare(self) -> None:
+        set_seed(self.random_seed)
+        self.device = torch_device("cuda" if is_cuda_available() else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = AutoModel.from_pretrained(self.model_name)
+        self.model.to(self.device)
+
+    def _embed(self, texts: Sequence[str]) -> Tensor:
+        encodings = self.tokenizer(
+            list(texts),
+            max_length=self.max_sequence_length,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        ).to(self.device)
+        output = self.model(**encodings)
+        return _mean_pooling(
+            output.last_hidden_state,
+            encodings["attention_mask"],
+        )
+
+    def encode(self, texts: Sequence[str]) -> ndarray:
+        """
+        Encode texts in batches, without gradients.
+        :return: Matrix with an embedding row for each text.
+        """
+        self.model.eval()
+        embeddings: List[Tensor] = []
+        with no_grad():
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                embeddings.append(self._embed(batch).cpu())
+        if len(embeddings) == 0:
+            return zeros((0, self.model.config.hidden_size))
+        return cat(embeddings).numpy()
+
+    def train(
+            self,
+            train_data: LabelledDataset,
+            dev_data: LabelledDataset,
+            cache_path: Path,
+    ):
+        pairs = labelled_pairs(train_data)
+        steps_per_epoch = (len(pairs) + self.batch_size - 1) // \
+            self.batch_size
+        optimizer = AdamW(
+            self.model.parameters(),
+            lr=self.learning_rate,
+            weight_decay=self.weight_decay,
+        )
+        scheduler = get_linear_schedule_with_warmup(
+            optimizer,
+            num_warmup_steps=int(
+                self.warmup_ratio * steps_per_epoch * self.epochs
+            ),
+            num_training_steps=steps_per_epoch * self.epochs,
+        )
+        random = Random(self.random_seed)
+        for epoch in range(self.epochs):
+            self.model.train()
+            random.shuffle(pairs)
+            total_loss = 0.0
+            for start in range(0, len(pairs), self.batch_size):
+                batch = pairs[start:start + self.batch_size]
+                labels = tensor(
+                    [float(train_data.labels[arg.id, kp.id])
+                     for arg, kp in batch],
+                    dtype=float32,
+                    device=self.device,
+                )
+                # Encode arguments and key points independently.
+                arg_embeddings = self._embed([arg.text for arg, _ in batch])
+                kp_embeddings = self._embed([kp.text for _, kp in batch])
+                similarities = cosine_similarity(
+                    arg_embeddings,
+                    kp_embeddings,
+                )
+                loss = mse_loss(similarities, labels)
+                loss.backward()
+                optimizer.step()
+                scheduler.step()
+                optimizer.zero_grad()
+                total_loss += loss.item() * len(batch)
+            print(f"Epoch {epoch + 1}/{self.epochs}: "
+                  f"train loss {total_loss / max(len(pairs), 1):.4f}, "
+                  f"dev loss {self._loss(dev_data):.4f}")
+        # Embeddings of the previous model are invalid.
+        self.key_point_embeddings = {}
+
+    def _loss(self, data: LabelledDataset) -> float:
+        pairs = labelled_pairs(data)
+        if len(pairs) == 0:
+            return 0
+        arg_texts = list(dict.fromkeys(arg.text for arg, _ in pairs))
+        kp_texts = list(dict.fromkeys(kp.text for _, kp in pairs))
+        arg_rows = {text: i for i, text in enumerate(arg_texts)}
+        kp_rows = {text: i for i, text in enumerate(kp_texts)}
+        similarities = cosine_similarities(
+            self.encode(arg_texts),
+            self.encode(kp_texts),
+        )
+        squared_errors = [
+            (similarities[arg_rows[arg.text], kp_rows[kp.text]]
+             - data.labels[arg.id, kp.id]) ** 2
+            for arg, kp in pairs
+        ]
+        return float(sum(squared_errors) / len(squared_errors))
+
+    def _key_point_embeddings(self, texts: List[str]) -> ndarray:
+        missing = [
+            text for text in dict.fromkeys(texts)
+            if text not in self.key_point_embeddings
+        ]
+        if len(missing) > 0:
+            for text, embedding in zip(missing, self.encode(missing)):
+                self.key_point_embeddings[text] = embedding
+        return stack([self.key_point_embeddings[text] for text in texts])
+
+    def predict(self, data: Dataset) -> Labels:
+        # Encode each unique argument once, in batches.
+        arg_texts = list(dict.fromkeys(
+            arg.text for arg in data.arguments_sorted
+        ))
+        arg_rows = {text: i for i, text in enumerate(arg_texts)}
+        all_arg_embeddings = self.encode(arg_texts)
+        # Encode each unique key point once, or look up cached embeddings.
+        self._key_point_embeddings(
+            [kp.text for kp in data.key_points_sorted]
+        )
+        labels: Labels = {}
+        for args, kps in data.groups.values():
+            arg_embeddings = all_arg_embeddings[
+                [arg_rows[arg.text] for arg in args]
+            ]
+            kp_embeddings = self._key_point_embeddings(
+                [kp.text for kp in kps]
+            )
+            scores = clip(
+                cosine_similarities(arg_embeddings, kp_embeddings),
+                0, 1,
+            )
+            for i, arg in enumerate(args):
+                for j, kp in enumerate(kps):
+                    labels[arg.id, kp.id] = float(scores[i, j])
+        return labels
+
+    def load_model(self, path: Path) -> bool:
+        model_path = path / "model"
+        if not model_path.exists() or not model_path.is_dir():
+            return False
+        else:
+            self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+            self.model = AutoModel.from_pretrained(model_path)
+            self.model.to(self.device)
+            self.key_point_embeddings = {}
+            return True
+
+    def save_model(self, path: Path):
+        model_path = path / "model"
+        self.model.save_pretrained(model_path)
+        self.tokenizer.save_pretrained(model_path)
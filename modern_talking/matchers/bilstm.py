@@ -3,7 +3,6 @@ from pathlib import Path
 from typing import List, Tuple, Optional
 
 from nlpaug.augmenter.word import WordAugmenter, SynonymAug
-from nltk.downloader import Downloader
 from numpy import ndarray, array
 from tensorflow import string, data, config
 # pylint: disable=import-error
@@ -30,6 +29,7 @@ from modern_talking.data.glove import download_glove_embeddings
 from modern_talking.matchers import Matcher, LabelPolicy
 from modern_talking.matchers.layers import text_vectorization_layer, \
     glove_embedding_layer
+from modern_talking.matchers.resources import require_augmenter
 from modern_talking.model import Dataset as UnlabelledDataset, Labels, \
     LabelledDataset, ArgumentKeyPointIdPair, Label
 
@@ -271,14 +271,8 @@ class BidirectionalLstmMatcher(Matcher):
         download_glove_embeddings()
 
         if self.augment > 0:
-            downloader = Downloader()
             # Download dependencies for augmenter.
-            if not downloader.is_installed("punkt"):
-                downloader.download("punkt")
-            if not downloader.is_installed("wordnet"):
-                downloader.download("wordnet")
-            if not downloader.is_installed("averaged_perceptron_tagger"):
-                downloader.download("averaged_perceptron_tagger")
+            require_augmenter()
 
     def train(
             self,
@@ -1,7 +1,11 @@
+from json import dump, load
+from math import ceil
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from modern_talking.matchers import Matcher
-from modern_talking.model import Dataset, Labels, ArgumentKeyPointIdPair
+from modern_talking.model import Dataset, Labels, ArgumentKeyPointIdPair, \
+    ArgumentKeyPointPair, Argument, KeyPoint
 from modern_talking.model import LabelledDataset
 
 
@@ -66,11 +70,12 @@ class Cascade(Matcher):
             labels_a: Labels,
             labels_b: Labels,
     ):
-        label_a = labels_a[arg_kp]
+        # Missing labels are treated as no match.
+        label_a = labels_a.get(arg_kp, 0)
         if label_a >= self.threshold:
             return label_a
         else:
-            return labels_b[arg_kp]
+            return labels_b.get(arg_kp, 0)
 
     def predict(self, data: Dataset) -> Labels:
         labels_a = self.matcher_a.predict(data)
@@ -83,3 +88,175 @@ class Cascade(Matcher):
             for kp in data.key_points
             if arg.topic == kp.topic and arg.stance == kp.stance
         }
+
+
+class RetrieveRerank(Matcher):
+    """
+    Two-stage matcher: a cheap retriever ranks the key points
+    of each argument, and only the top-ranked candidates are scored
+    by an expensive reranker, e.g., a cross-encoder.
+    The number of candidates per argument is calibrated on the dev set,
+    as the smallest cut-off at which the target share of arguments
+    still has its best gold key point among the candidates.
+    Pairs that are not candidates are not labelled.
+    """
+
+    retriever: Matcher
+    reranker: Matcher
+    target_recall: float
+    threshold: Optional[float]
+    candidates: Optional[int] = None
+
+    def __init__(
+            self,
+            retriever: Matcher,
+            reranker: Matcher,
+            target_recall: float = 0.95,
+            threshold: Optional[float] = None,
+    ):
+        """
+        :param retriever: Matcher to rank candidate key points with.
+        :param reranker: Matcher to score candidate pairs with.
+        :param target_recall: Share of dev arguments whose best gold
+        key point should be retrieved as a candidate.
+        :param threshold: If set, pairs with a retriever score
+        of at least the threshold are also candidates.
+        """
+        self.retriever = retriever
+        self.reranker = reranker
+        self.target_recall = target_recall
+        self.threshold = threshold
+
+    @property
+    def slug(self) -> str:
+        threshold_suffix = f"-threshold-{self.threshold}" \
+            if self.threshold is not None else ""
+        return f"retrieve-rerank" \
+               f"-recall-{self.target_recall}" \
+               f"{threshold_suffix}" \
+               f"-{self.retriever.slug}" \
+               f"-{self.reranker.slug}"
+
+    def prepare(self) -> None:
+        self.retriever.prepare()
+        self.reranker.prepare()
+
+    def load_model(self, path: Path) -> bool:
+        path_retriever = path / self.retriever.slug
+        path_reranker = path / self.reranker.slug
+        candidates_file = path / "candidates.json"
+        if not path_retriever.exists() or not path_reranker.exists() \
+                or not candidates_file.exists():
+            return False
+        with candidates_file.open("r") as file:
+            self.candidates = load(file)["candidates"]
+        return (self.retriever.load_model(path_retriever)
+                and self.reranker.load_model(path_reranker))
+
+    def save_model(self, path: Path):
+        path_retriever = path / self.retriever.slug
+        path_reranker = path / self.reranker.slug
+        path_retriever.mkdir(parents=True, exist_ok=True)
+        path_reranker.mkdir(parents=True, exist_ok=True)
+        self.retriever.save_model(path_retriever)
+        self.reranker.save_model(path_reranker)
+        with (path / "candidates.json").open("w") as file:
+            dump({"candidates": self.candidates}, file)
+
+    def train(
+            self,
+            train_data: LabelledDataset,
+            dev_data: LabelledDataset,
+            cache_path: Path,
+    ):
+        cache_path_retriever = cache_path / self.retriever.slug
+        cache_path_reranker = cache_path / self.reranker.slug
+        cache_path_retriever.mkdir(parents=True, exist_ok=True)
+        cache_path_reranker.mkdir(parents=True, exist_ok=True)
+        self.retriever.train(train_data, dev_data, cache_path_retriever)
+        self.reranker.train(train_data, dev_data, cache_path_reranker)
+        self.candidates = self.calibrate_candidates(dev_data)
+        print(f"Rerank top {self.candidates} key points per argument.")
+
+    @staticmethod
+    def rank_key_points(
+            data: Dataset,
+            labels: Labels,
+    ) -> Dict[Argument, List[KeyPoint]]:
+        """
+        Rank the key points of each argument's topic and stance
+        by descending retriever score. Missing labels count as no match.
+        """
+        return {
+            arg: sorted(
+                kps,
+                key=lambda kp: labels.get((arg.id, kp.id), 0),
+                reverse=True,
+            )
+            for args, kps in data.groups.values()
+            for arg in args
+        }
+
+    def calibrate_candidates(self, dev_data: LabelledDataset) -> int:
+        """
+        Find the smallest number of candidates per argument such that
+        the best gold key point, i.e., the highest ranked key point
+        labelled as match, is retrieved for the target share
+        of dev arguments with at least one matching key point.
+        """
+        ranking = self.rank_key_points(
+            dev_data,
+            self.retriever.predict(dev_data),
+        )
+        max_candidates = max(
+            (len(kps) for kps in ranking.values()),
+            default=1,
+        )
+        gold_ranks: List[int] = []
+        for arg, kps in ranking.items():
+            rank = next(
+                (
+                    i + 1
+                    for i, kp in enumerate(kps)
+                    if dev_data.labels.get((arg.id, kp.id), 0) >= 0.5
+                ),
+                None,
+            )
+            if rank is not None:
+                gold_ranks.append(rank)
+        if len(gold_ranks) == 0:
+            return max_candidates
+        gold_ranks.sort()
+        retrieved = min(
+            len(gold_ranks),
+            max(1, ceil(len(gold_ranks) * self.target_recall)),
+        )
+        return gold_ranks[retrieved - 1]
+
+    def candidate_pairs(self, data: Dataset) -> List[ArgumentKeyPointPair]:
+        """
+        Retrieve the top-ranked candidate key points of each argument,
+        and all key points scored above the threshold, if set.
+        The number of candidates must be calibrated first,
+        by training the matcher or loading a trained model.
+        """
+        if self.candidates is None:
+            raise RuntimeError(
+                "Number of candidates not calibrated. "
+                "Train or load the model before predicting."
+            )
+        labels = self.retriever.predict(data)
+        ranking = self.rank_key_points(data, labels)
+        pairs: List[ArgumentKeyPointPair] = []
+        for arg, kps in ranking.items():
+            for i, kp in enumerate(kps):
+                if i < self.candidates or (
+                        self.threshold is not None and
+                        labels.get((arg.id, kp.id), 0) >= self.threshold
+                ):
+                    pairs.append((arg, kp))
+        return pairs
+
+    def predict(self, data: Dataset) -> Labels:
+        pairs = self.candidate_pairs(data)
+        return self.reranker.predict_pairs(data, pairs)
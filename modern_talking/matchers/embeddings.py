@@ -0,0 +1,126 @@
+from hashlib import sha256
+from json import dump, load
+from os import replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from numpy import ndarray, memmap, float32, ascontiguousarray, zeros, \
+    array, int64
+from sklearn.preprocessing import normalize
+
+data_dir = Path(__file__).parent.parent.parent / "data"
+embeddings_dir = data_dir / "cache" / "embeddings"
+
+
+def text_hash(text: str) -> str:
+    return sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of text embeddings computed with a single model.
+    Embeddings are appended as float32 rows to a binary file that is
+    memory-mapped read-only, and an index maps text hashes to rows.
+    Thus, each unique text is encoded only once, across runs.
+    """
+
+    path: Path
+    index: Dict[str, int]
+    dimensions: Optional[int]
+    embeddings: Optional[memmap]
+
+    def __init__(self, model_name: str):
+        """
+        :param model_name: Unique name of the model and its configuration,
+        e.g., including the pooling strategy.
+        """
+        self.path = embeddings_dir / model_name.replace("/", "--")
+        self.index = {}
+        self.dimensions = None
+        self.embeddings = None
+        index_file = self.path / "index.json"
+        if index_file.exists():
+            with index_file.open("r") as file:
+                json = load(file)
+            self.dimensions = json["dimensions"]
+            self.index = {
+                hash_value: row
+                for row, hash_value in enumerate(json["hashes"])
+            }
+            self._map()
+
+    def _map(self):
+        if len(self.index) == 0:
+            self.embeddings = None
+            return
+        self.embeddings = memmap(
+            self.path / "embeddings.f32",
+            dtype=float32,
+            mode="r",
+            shape=(len(self.index), self.dimensions),
+        )
+
+    def _append(self, hashes: List[str], embeddings: ndarray):
+        self.path.mkdir(parents=True, exist_ok=True)
+        embeddings = ascontiguousarray(embeddings, dtype=float32)
+        if self.dimensions is None:
+            self.dimensions = embeddings.shape[1]
+        embeddings_file = self.path / "embeddings.f32"
+        with embeddings_file.open("ab") as file:
+            # Drop orphan rows from an interrupted append, which the index
+            # doesn't reference, so that new rows are numbered correctly.
+            file.truncate(
+                len(self.index) * self.dimensions * float32().itemsize
+            )
+            file.write(embeddings.tobytes())
+        for hash_value in hashes:
+            self.index[hash_value] = len(self.index)
+        # Write the index last, so that it never references missing rows.
+        # Replace the index atomically, so that it is never incomplete.
+        temporary_index_file = self.path / "index.json.tmp"
+        with temporary_index_file.open("w") as file:
+            dump({
+                "dimensions": self.dimensions,
+                "hashes": list(self.index.keys()),
+            }, file)
+        replace(temporary_index_file, self.path / "index.json")
+        self._map()
+
+    def embed(
+            self,
+            texts: Sequence[str],
+            encode: Callable[[List[str]], ndarray],
+    ) -> ndarray:
+        """
+        Look up embeddings of the texts, encoding only texts
+        that are not cached yet, with a single call.
+        :param encode: Function encoding a list of texts in batches.
+        :return: Matrix with a row for each text.
+        """
+        hashes = [text_hash(text) for text in texts]
+        missing: Dict[str, str] = {}
+        for hash_value, text in zip(hashes, texts):
+            if hash_value not in self.index:
+                missing.setdefault(hash_value, text)
+        if len(missing) > 0:
+            self._append(
+                list(missing.keys()),
+                encode(list(missing.values())),
+            )
+        if len(hashes) == 0:
+            return zeros((0, self.dimensions or 0), dtype=float32)
+        rows = array([self.index[hash_value] for hash_value in hashes],
+                     dtype=int64)
+        return self.embeddings[rows]
+
+
+def cosine_similarities(
+        arg_embeddings: ndarray,
+        kp_embeddings: ndarray,
+) -> ndarray:
+    """
+    Compute cosine similarities of all pairs of arguments and key points
+    with a single product of the normalized embedding matrices.
+    :return: Dense matrix with arguments as rows and key points as columns.
+    """
+    return normalize(arg_embeddings) @ normalize(kp_embeddings).T
@@ -0,0 +1,213 @@
+from concurrent.futures import Executor
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union, Callable, \
+    Iterable
+
+from joblib import dump, load
+from numpy import log, array, int64, minimum
+from scipy.sparse import csr_matrix, save_npz, load_npz
+from sklearn.feature_extraction.text import CountVectorizer, \
+    TfidfVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from modern_talking.matchers.preprocessing import preprocess_texts
+from modern_talking.matchers.tokenization import TokenizerType
+
+data_dir = Path(__file__).parent.parent.parent / "data"
+features_dir = data_dir / "cache" / "features"
+
+Vectorizer = Union[CountVectorizer, HashingVectorizer]
+
+
+def features_key(texts: Iterable[str], *config: object) -> str:
+    """
+    Hash a sequence of input texts together with the configuration
+    used to extract features from them, e.g., preprocessing options
+    and the encoder's fingerprint.
+    Texts are hashed in order, as the order determines the feature rows.
+    """
+    digest = sha256()
+    for value in config:
+        digest.update(repr(value).encode())
+        digest.update(b"\0")
+    for text in texts:
+        digest.update(text.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def encoder_fingerprint(encoder: Vectorizer) -> str:
+    """
+    Hash a vectorizer's parameters and, if fitted,
+    its vocabulary and IDF weights.
+    """
+    digest = sha256(repr(sorted(
+        encoder.get_params(deep=False).items()
+    )).encode())
+    vocabulary: Optional[Dict[str, int]] = getattr(
+        encoder, "vocabulary_", None
+    )
+    if vocabulary is not None:
+        digest.update(repr(sorted(vocabulary.items())).encode())
+    if isinstance(encoder, TfidfVectorizer) and \
+            hasattr(encoder, "idf_"):
+        digest.update(encoder.idf_.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def load_cached_features(
+        key: str,
+        compute: Callable[[], csr_matrix],
+) -> csr_matrix:
+    """
+    Load a sparse feature matrix from the cache directory,
+    or compute and save it if it isn't cached yet.
+    Matrices are saved uncompressed, as loading is then
+    bound by disk reads only.
+    The cache is unbounded and entries are never evicted;
+    delete the `data/cache/features` directory to clear it.
+    """
+    path = features_dir / f"{key}.npz"
+    if path.exists():
+        return load_npz(path).tocsr()
+    features = csr_matrix(compute())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    save_npz(path, features, compressed=False)
+    return features
+
+
+def load_cached_encoder(
+        key: str,
+        fit: Callable[[], Vectorizer],
+) -> Vectorizer:
+    """
+    Load a fitted vectorizer from the cache directory,
+    or fit and save it if it isn't cached yet.
+    """
+    path = features_dir / f"{key}.joblib"
+    if path.exists():
+        return load(path)
+    encoder = fit()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dump(encoder, path)
+    return encoder
+
+
+class PairFeatureComposer:
+    """
+    Compose bag-of-words features of text pairs from the features
+    of each unique text.
+    Each unique text is preprocessed and vectorized only once,
+    and the features of a pair are the sum of both texts' term counts.
+    Because the vectorizer counts terms, this is equal to vectorizing
+    the concatenation of both preprocessed texts.
+    For TF-IDF vectorizers, the TF-IDF weighting is applied to
+    the summed term counts.
+    Hashing vectorizers must count terms without normalization
+    and alternating signs, such that counts are additive.
+    """
+
+    encoder: Vectorizer
+    language: str
+    stemming: bool
+    tokenizer: TokenizerType
+    processes: Optional[int]
+    executor: Optional[Executor]
+    cache: bool
+
+    def __init__(
+            self,
+            encoder: Vectorizer,
+            language: str = "english",
+            stemming: bool = True,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+            processes: Optional[int] = None,
+            executor: Optional[Executor] = None,
+            cache: bool = False,
+    ):
+        """
+        :param encoder: Fitted or stateless vectorizer.
+        :param executor: Existing process pool for preprocessing,
+        e.g., shared across chunks of pairs.
+        :param cache: If true, cache composed features on disk, keyed by
+        the pair texts, the preprocessing options, and the encoder.
+        """
+        self.encoder = encoder
+        self.language = language
+        self.stemming = stemming
+        self.tokenizer = tokenizer
+        self.processes = processes
+        self.executor = executor
+        self.cache = cache
+
+    def text_counts(self, texts: Sequence[str]) -> csr_matrix:
+        """
+        Preprocess and count the terms of each text,
+        using the vectorizer's vocabulary but no weighting.
+        """
+        preprocessed = preprocess_texts(
+            texts,
+            language=self.language,
+            stemming=self.stemming,
+            tokenizer=self.tokenizer,
+            processes=self.processes,
+            executor=self.executor,
+        )
+        preprocessed_texts = [
+            " ".join(preprocessed.terms(text))
+            for text in texts
+        ]
+        if isinstance(self.encoder, HashingVectorizer):
+            return self.encoder.transform(preprocessed_texts)
+        # Skip TF-IDF weighting, as weights of a sum are not additive.
+        return CountVectorizer.transform(self.encoder, preprocessed_texts)
+
+    def weight(self, counts: csr_matrix) -> csr_matrix:
+        """
+        Apply the vectorizer's weighting to term counts.
+        """
+        if self.encoder.binary:
+            counts.data = minimum(counts.data, 1)
+        if not isinstance(self.encoder, TfidfVectorizer):
+            return counts
+        counts = counts.astype(float)
+        if self.encoder.sublinear_tf:
+            counts.data = log(counts.data) + 1
+        if self.encoder.use_idf:
+            counts = csr_matrix(counts.multiply(self.encoder.idf_))
+        if self.encoder.norm is not None:
+            counts = normalize(counts, norm=self.encoder.norm, copy=False)
+        return counts
+
+    def transform(self, pairs: Sequence[Tuple[str, str]]) -> csr_matrix:
+        """
+        Compose features of text pairs, e.g., argument and key point texts.
+        :return: Sparse matrix with a row for each pair.
+        """
+        if not self.cache:
+            return self._transform(pairs)
+        key = features_key(
+            (text for pair in pairs for text in pair),
+            "pairs",
+            self.language,
+            self.stemming,
+            str(self.tokenizer),
+            encoder_fingerprint(self.encoder),
+        )
+        return load_cached_features(key, lambda: self._transform(pairs))
+
+    def _transform(self, pairs: Sequence[Tuple[str, str]]) -> csr_matrix:
+        rows: Dict[str, int] = {}
+        for first, second in pairs:
+            rows.setdefault(first, len(rows))
+            rows.setdefault(second, len(rows))
+        texts: List[str] = list(rows.keys())
+        text_counts = self.text_counts(texts)
+        first_rows = array([rows[first] for first, _ in pairs], dtype=int64)
+        second_rows = array(
+            [rows[second] for _, second in pairs],
+            dtype=int64,
+        )
+        counts = text_counts[first_rows] + text_counts[second_rows]
+        return self.weight(counts)
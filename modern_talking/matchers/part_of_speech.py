@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from functools import lru_cache
+from os import system
+from typing import Dict, Iterable, FrozenSet, Tuple, Optional
+
+from spacy import Language, load as spacy_load
+from spacy.util import is_package
+
+# Part-of-speech tags of tokens to keep.
+SELECTED_POS: FrozenSet[str] = frozenset({
+    "ADJ", "ADV", "AUX", "NOUN", "PRON", "PROPN", "VERB"
+})
+
+# Pipeline components not needed for coarse-grained POS tags.
+# Coarse-grained tags are mapped from the tagger's fine-grained tags
+# by the attribute ruler, and the tagger listens to the tok2vec layer.
+_EXCLUDED_COMPONENTS = ["parser", "ner", "lemmatizer", "senter"]
+
+
+@lru_cache(maxsize=None)
+def part_of_speech_language(model: str = "en_core_web_sm") -> Language:
+    """
+    Shared spaCy pipeline with only the components needed for
+    part-of-speech tags, i.e., tok2vec, tagger and attribute ruler.
+    The model is installed if missing, and loaded once per process.
+    """
+    if not is_package(model):
+        system(f"python -m spacy download {model}")
+    return spacy_load(model, exclude=_EXCLUDED_COMPONENTS)
+
+
+class PartOfSpeechFilter:
+    """
+    Select tokens by their part-of-speech tag.
+    Unique texts are tagged in batches with `nlp.pipe`,
+    and filtered texts are cached for the most recently used texts.
+    """
+
+    model: str
+    batch_size: int
+    processes: int
+    cache_size: Optional[int]
+    cache: "OrderedDict[str, str]"
+
+    def __init__(
+            self,
+            model: str = "en_core_web_sm",
+            batch_size: int = 256,
+            processes: int = 1,
+            cache_size: Optional[int] = 2 ** 16,
+    ):
+        """
+        :param batch_size: Number of texts per spaCy batch.
+        :param processes: Number of processes spaCy tags texts with.
+        :param cache_size: Maximum number of texts for which filtered
+        texts are cached. If None, the cache is unbounded.
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.processes = processes
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    @property
+    def config(self) -> Tuple[str, ...]:
+        """
+        Options that determine the filtered texts, e.g., for cache keys.
+        """
+        return (self.model, *sorted(SELECTED_POS))
+
+    def prepare(self) -> None:
+        part_of_speech_language(self.model)
+
+    def filter_texts(self, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        Filter all unique texts, tagging texts that are not cached yet
+        in batches.
+        :return: Filtered text for each unique text.
+        """
+        filtered_texts: Dict[str, str] = {}
+        missing_texts = []
+        for text in dict.fromkeys(texts):
+            if text in self.cache:
+                self.cache.move_to_end(text)
+                filtered_texts[text] = self.cache[text]
+            else:
+                missing_texts.append(text)
+        if len(missing_texts) == 0:
+            return filtered_texts
+        language = part_of_speech_language(self.model)
+        docs = language.pipe(
+            missing_texts,
+            batch_size=self.batch_size,
+            n_process=self.processes,
+        )
+        for text, doc in zip(missing_texts, docs):
+            filtered_text = " ".join(
+                token.text
+                for token in doc
+                if token.pos_ in SELECTED_POS
+            )
+            filtered_texts[text] = filtered_text
+            self.cache[text] = filtered_text
+            if self.cache_size is not None and \
+                    len(self.cache) > self.cache_size:
+                # Evict the least recently used text.
+                self.cache.popitem(last=False)
+        return filtered_texts
+
+    def filter(self, text: str) -> str:
+        """
+        Keep only tokens with selected part-of-speech tags.
+        """
+        return self.filter_texts((text,))[text]
@@ -0,0 +1,127 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from os import cpu_count
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from numpy import ndarray, array, int32
+
+from modern_talking.matchers.resources import stemmer, initialize_worker
+from modern_talking.matchers.term_index import TermVocabulary
+from modern_talking.matchers.tokenization import TokenizerType, \
+    get_tokenizer
+
+
+def tokenize(
+        text: str,
+        language: str,
+        stemming: bool,
+        tokenizer: TokenizerType = TokenizerType.nltk,
+) -> List[str]:
+    """
+    Tokenize a text and optionally transform terms to stems.
+    """
+    terms = get_tokenizer(tokenizer).tokenize(text)
+    if stemming:
+        language_stemmer = stemmer(language)
+        terms = [language_stemmer.stem(term) for term in terms]
+    return terms
+
+
+def _tokenize_chunk(
+        chunk: Tuple[List[str], str, bool, TokenizerType]
+) -> List[List[str]]:
+    texts, language, stemming, tokenizer = chunk
+    return [tokenize(text, language, stemming, tokenizer) for text in texts]
+
+
+class PreprocessedTexts:
+    """
+    Term ID arrays of preprocessed texts, with a shared vocabulary.
+    """
+
+    vocabulary: TermVocabulary
+    term_ids: Dict[str, ndarray]
+    _terms: List[str]
+
+    def __init__(self, vocabulary: TermVocabulary,
+                 term_ids: Dict[str, ndarray]):
+        self.vocabulary = vocabulary
+        self.term_ids = term_ids
+        self._terms = list(vocabulary.ids.keys())
+
+    def __contains__(self, text: str) -> bool:
+        return text in self.term_ids
+
+    def terms(self, text: str) -> List[str]:
+        """
+        Preprocessed terms of a text, in the order of their occurrence.
+        """
+        return [self._terms[term_id] for term_id in self.term_ids[text]]
+
+
+def process_pool(
+        language: str = "english",
+        stemming: bool = True,
+        processes: Optional[int] = None,
+) -> ProcessPoolExecutor:
+    """
+    Process pool for preprocessing texts, e.g., to be shared
+    by many calls of `preprocess_texts`.
+    :param processes: Maximum number of worker processes.
+    If None, use as many processes as CPUs are available.
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes or cpu_count() or 1,
+        initializer=initialize_worker,
+        initargs=(language, stemming),
+    )
+
+
+def preprocess_texts(
+        texts: Iterable[str],
+        language: str = "english",
+        stemming: bool = True,
+        tokenizer: TokenizerType = TokenizerType.nltk,
+        processes: Optional[int] = None,
+        chunk_size: int = 512,
+        executor: Optional[Executor] = None,
+) -> PreprocessedTexts:
+    """
+    Tokenize and stem each unique text exactly once.
+    Unique texts are split into chunks that are distributed
+    across a process pool.
+    Tokenizers are passed to workers by type, and each worker
+    uses its own shared tokenizer instance.
+    Term IDs are assigned in the main process in the order of the texts,
+    so the output doesn't depend on the number of processes.
+    :param processes: Maximum number of worker processes.
+    If None, use as many processes as CPUs are available.
+    :param chunk_size: Number of texts per chunk sent to a worker.
+    :param executor: Existing pool to distribute chunks to.
+    If None, a new process pool is started if there are multiple chunks.
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    chunks = [
+        (
+            unique_texts[start:start + chunk_size],
+            language,
+            stemming,
+            tokenizer,
+        )
+        for start in range(0, len(unique_texts), chunk_size)
+    ]
+    if processes is None:
+        processes = cpu_count() or 1
+    if len(chunks) <= 1 or (executor is None and processes <= 1):
+        chunk_terms = map(_tokenize_chunk, chunks)
+    elif executor is not None:
+        chunk_terms = list(executor.map(_tokenize_chunk, chunks))
+    else:
+        with process_pool(language, stemming, processes) as pool:
+            chunk_terms = list(pool.map(_tokenize_chunk, chunks))
+
+    vocabulary = TermVocabulary()
+    term_ids: Dict[str, ndarray] = {}
+    for (chunk_texts, _, _, _), terms in zip(chunks, chunk_terms):
+        for text, text_terms in zip(chunk_texts, terms):
+            term_ids[text] = array(vocabulary.encode(text_terms), dtype=int32)
+    return PreprocessedTexts(vocabulary, term_ids)
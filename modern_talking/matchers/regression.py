@@ -1,33 +1,149 @@
-from os import system
+from concurrent.futures import Executor
+from contextlib import nullcontext
 from pathlib import Path
-from pickle import dump, load
-from typing import List
+from enum import Enum
+from itertools import chain, islice
+from typing import List, Tuple, Iterable, Iterator, Callable, Optional, \
+    Union
 from tqdm import tqdm
 
-from nltk.downloader import Downloader
-from nltk.stem import SnowballStemmer
-from nltk.tokenize import word_tokenize
-from numpy import array
+from joblib import dump, load, Parallel, delayed
+from numpy import array, ndarray, average
+from scipy.sparse import csr_matrix
+from sklearn.base import ClassifierMixin
+from sklearn.calibration import CalibratedClassifierCV
 from sklearn.ensemble import VotingClassifier
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
-from spacy import Language, load as spacy_load
-from spacy.util import is_package
+from sklearn.feature_extraction.text import TfidfVectorizer, \
+    HashingVectorizer
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import ShuffleSplit
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import normalize
+from sklearn.svm import SVC, LinearSVC
 
 from modern_talking.matchers import Matcher, UntrainedMatcher
-from modern_talking.model import Dataset, Labels, Argument, KeyPoint
+from modern_talking.matchers.embeddings import EmbeddingCache, \
+    cosine_similarities
+from modern_talking.matchers.features import PairFeatureComposer, \
+    Vectorizer, features_key, encoder_fingerprint, load_cached_features, \
+    load_cached_encoder
+from modern_talking.matchers.part_of_speech import PartOfSpeechFilter
+from modern_talking.matchers.preprocessing import preprocess_texts, \
+    process_pool
+from modern_talking.matchers.resources import require_tokenizer, stemmer
+from modern_talking.matchers.tokenization import TokenizerType, \
+    get_tokenizer
+from modern_talking.model import Dataset, Labels, Argument, KeyPoint, \
+    Label
 from modern_talking.model import LabelledDataset
 
 from simpletransformers.language_representation import RepresentationModel
-from scipy.spatial import distance
 
-downloader = Downloader()
+
+class SvmType(str, Enum):
+    """
+    Support vector machine used by SVM-based matchers.
+    The kernel SVM is trained in quadratic to cubic time and calibrated
+    with internal 5-fold cross-validation. The linear SVM and
+    the linear SVM on a Nystroem kernel approximation
+    train in near-linear time and are calibrated in a single pass.
+    """
+    kernel = "kernel"
+    linear = "linear"
+    nystroem = "nystroem"
+
+    def __str__(self):
+        # pylint: disable=invalid-str-returned
+        return self.value
+
+    @property
+    def slug_suffix(self) -> str:
+        return f"-{self.value}" if self != SvmType.kernel else ""
+
+
+def svm_classifier(
+        svm_type: SvmType,
+        nystroem_components: int = 500,
+) -> ClassifierMixin:
+    """
+    Create an SVM classifier that predicts probabilities.
+    Linear SVMs are fitted once on 90% of the training data
+    and calibrated with Platt scaling on the remaining 10%.
+    """
+    if svm_type == SvmType.kernel:
+        return SVC(probability=True)
+    elif svm_type == SvmType.linear:
+        svm = LinearSVC()
+    elif svm_type == SvmType.nystroem:
+        svm = make_pipeline(
+            Nystroem(n_components=nystroem_components, random_state=42),
+            LinearSVC(),
+        )
+    else:
+        raise Exception("Unknown SVM type")
+    return CalibratedClassifierCV(
+        svm,
+        method="sigmoid",
+        cv=ShuffleSplit(n_splits=1, test_size=0.1, random_state=42),
+    )
+
+
+# File name of persisted scikit-learn models in a matcher's model directory.
+_model_file_name = "model.joblib"
+
+
+def save_sklearn_model(
+        path: Path,
+        model: ClassifierMixin,
+        encoder: Union[CountVectorizer, HashingVectorizer],
+):
+    """
+    Save a scikit-learn model and its encoder to the model directory.
+    Large arrays, like coefficients, support vectors or IDF weights,
+    are stored uncompressed such that they can be memory-mapped.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    dump((model, encoder), path / _model_file_name)
+
+
+def load_sklearn_model(path: Path) -> Optional[Tuple[
+    ClassifierMixin,
+    Union[CountVectorizer, HashingVectorizer],
+]]:
+    """
+    Load a scikit-learn model and its encoder from the model directory.
+    Arrays are memory-mapped read-only, so processes serving the same model
+    share a single physical copy, and loading is almost instantaneous.
+    :return: The model and encoder, or None if no model was saved.
+    """
+    file_path = path / _model_file_name
+    if not file_path.is_file():
+        return None
+    return load(file_path, mmap_mode="r")
 
 
 class SimpleTransformMatcher(UntrainedMatcher):
+    """
+    Label pairs by the cosine distance of mean-pooled BERT embeddings.
+    Each unique argument and key point text is encoded once, in batches,
+    and embeddings are cached on disk across runs.
+    Distances are computed per topic and stance group
+    with a single matrix product.
+    """
+
+    model_type: str = "bert"
+    model_name: str = "bert-base-uncased"
+    batch_size: int
     transform_model: RepresentationModel
+    embedding_cache: EmbeddingCache
+
+    def __init__(self, batch_size: int = 128):
+        """
+        :param batch_size: Number of texts per encoding batch.
+        """
+        self.batch_size = batch_size
 
     @property
     def slug(self) -> str:
@@ -35,96 +151,120 @@ class SimpleTransformMatcher(UntrainedMatcher):
 
     def prepare(self) -> None:
         self.transform_model = RepresentationModel(
-            model_type="bert",
-            model_name="bert-base-uncased",
+            model_type=self.model_type,
+            model_name=self.model_name,
             args={"manual_seed": 42},
             use_cuda=False,
         )
+        self.embedding_cache = EmbeddingCache(
+            f"{self.model_type}-{self.model_name}-mean"
+        )
 
-    def get_similarity_score(self, arg, kp):
-        vectors = self.transform_model.encode_sentences(
-            [arg.text, kp.text],
+    def encode(self, texts: List[str]) -> ndarray:
+        return self.transform_model.encode_sentences(
+            texts,
             combine_strategy="mean",
+            batch_size=self.batch_size,
         )
-        score = distance.cosine(vectors[0], vectors[1])
-        if score <= 0.5:
-            label = 0
-        else:
-            label = 1
-        return label
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_similarity_score(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        # Encode all unique texts at once.
+        self.embedding_cache.embed(
+            [arg.text for arg in data.arguments_sorted] +
+            [kp.text for kp in data.key_points_sorted],
+            self.encode,
+        )
+        labels: Labels = {}
+        for args, kps in data.groups.values():
+            arg_embeddings = self.embedding_cache.embed(
+                [arg.text for arg in args], self.encode,
+            )
+            kp_embeddings = self.embedding_cache.embed(
+                [kp.text for kp in kps], self.encode,
+            )
+            distances = 1 - cosine_similarities(arg_embeddings, kp_embeddings)
+            for i, arg in enumerate(args):
+                for j, kp in enumerate(kps):
+                    labels[arg.id, kp.id] = 1 if distances[i, j] > 0.5 else 0
+        return labels
 
 
 class SVCPartOfSpeechMatcher(Matcher):
-    model: SVC = None
+    model: ClassifierMixin = None
     encoder: CountVectorizer = None
-    language: Language
+    pos_filter: PartOfSpeechFilter
+    svm: SvmType
+    tokenizer: TokenizerType
+
+    def __init__(
+            self,
+            batch_size: int = 256,
+            processes: int = 1,
+            svm: SvmType = SvmType.kernel,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+    ):
+        """
+        :param batch_size: Number of texts per part-of-speech tagging batch.
+        :param processes: Number of part-of-speech tagging processes.
+        :param svm: Support vector machine type.
+        :param tokenizer: Tokenizer backend.
+        """
+        self.pos_filter = PartOfSpeechFilter(
+            batch_size=batch_size,
+            processes=processes,
+        )
+        self.svm = svm
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "svc-bow-pos"
+        return f"svc-bow-pos{self.svm.slug_suffix}" \
+               f"{tokenizer_suffix(self.tokenizer)}"
 
     def prepare(self) -> None:
-        if not is_package("en_core_web_sm"):
-            system("python -m spacy download en_core_web_sm")
-        self.language = spacy_load("en_core_web_sm")
-        return
+        self.pos_filter.prepare()
 
     def get_token_by_pos(self, text: str) -> str:
-        doc = self.language(text)
-        pos_list = []
-        selected_pos = ["ADJ", "ADV", "AUX", "NOUN", "PRON", "PROPN", "VERB"]
-        for token in doc:
-            if token.pos_ in selected_pos:
-                pos_list.append(token.text)
-        return " ".join(pos_list)
+        return self.pos_filter.filter(text)
 
     def load_model(self, path: Path) -> bool:
-        file_path = path / self.name
         if self.model is not None and self.encoder is not None:
             return True
-        if not file_path.exists() or not file_path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with file_path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        """update the path because of changes on main.py"""
-        matcher_path = path.parent.absolute()
-        matcher_path.mkdir(exist_ok=True)
-        path.mkdir(exist_ok=True)
-        file_path = path / self.name
-        with file_path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def get_texts(self, train_data: LabelledDataset) -> List[str]:
-        stemmer = SnowballStemmer("english")
+        english_stemmer = stemmer("english")
+        tokenizer = get_tokenizer(self.tokenizer)
+        # Tag each unique text once, in batches.
+        filtered_texts = self.pos_filter.filter_texts(
+            [arg.text for arg in train_data.arguments_sorted] +
+            [kp.text for kp in train_data.key_points_sorted]
+        )
         train_texts: List[str] = []
         for (arg_id, kp_id), label in tqdm(train_data.labels.items()):
-            arg = next(arg for arg in train_data.arguments if arg.id == arg_id)
-            kp = next(kp for kp in train_data.key_points if kp.id == kp_id)
+            arg = train_data.arguments_by_id[arg_id]
+            kp = train_data.key_points_by_id[kp_id]
             """
             tp = arg.topic
             tp_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(tp))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(self.get_token_by_pos(tp))
             ]
             """
             arg_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(arg.text))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(filtered_texts[arg.text])
             ]
             kp_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(kp.text))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(filtered_texts[kp.text])
             ]
 
             # text = " ".join(tp_terms) + " ".join(arg_terms) + \
@@ -142,27 +282,58 @@ class SVCPartOfSpeechMatcher(Matcher):
 
         self.train_encoder(train_data)
 
-        train_features = self.encoder.transform(self.get_texts(train_data))
+        train_features = transform_cached(
+            self.encoder,
+            pair_texts(labelled_pairs(train_data)),
+            (str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_texts(train_data),
+        )
         train_labels = array(list(train_data.labels.values()))
 
-        svc = SVC(probability=True)
+        svc = svm_classifier(self.svm)
         self.model = svc
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = self.get_texts(train_data)
-        self.encoder = CountVectorizer()  # token_pattern="^[a-zA-Z]{3,7}$")
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            CountVectorizer(),  # token_pattern="^[a-zA-Z]{3,7}$")
+            pair_texts(labelled_pairs(train_data)),
+            (str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_texts(train_data),
+        )
+
+    @staticmethod
+    def get_input_text(argument: Argument, key_point: KeyPoint) -> str:
+        return f"{argument.topic} {argument.text}. {key_point.text}"
+
+    def get_features_text(
+            self,
+            argument: Argument,
+            key_point: KeyPoint,
+    ) -> str:
+        input_text = self.get_input_text(argument, key_point)
+        return self.stem_text(self.get_token_by_pos(input_text))
+
+    def stem_text(self, text: str) -> str:
+        english_stemmer = stemmer("english")
+        return " ".join(
+            english_stemmer.stem(term)
+            for term in get_tokenizer(self.tokenizer).tokenize(text)
+        )
+
+    def get_features_texts(
+            self,
+            pairs: List[Tuple[Argument, KeyPoint]],
+    ) -> List[str]:
+        # Tag each unique input text once, in batches.
+        input_texts = [self.get_input_text(arg, kp) for arg, kp in pairs]
+        filtered_texts = self.pos_filter.filter_texts(input_texts)
+        return [self.stem_text(filtered_texts[text]) for text in input_texts]
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = f"{argument.topic} {argument.text}. {key_point.text}"
-        input_text = self.get_token_by_pos(input_text)
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
-        )
-        features = self.encoder.transform([input_text]).toarray()
+        input_text = self.get_features_text(argument, key_point)
+        features = self.encoder.transform([input_text])
         # Predict label and probability with pretrained model.
         # probability = self.model.predict_proba(features)
         # score = probability[0][1]  # get probability of class 1
@@ -170,69 +341,99 @@ class SVCPartOfSpeechMatcher(Matcher):
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        pairs = candidate_pairs(data)
+        features = transform_cached(
+            self.encoder,
+            [self.get_input_text(arg, kp) for arg, kp in pairs],
+            ("input", str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_features_texts(pairs),
+        )
+        return predict_features(
+            pairs,
+            features,
+            self.model,
+            probability=False,
+        )
 
 
 class EnsemblePartOfSpeechMatcher(Matcher):
     model: VotingClassifier = None
     encoder: CountVectorizer = None
-    language: Language
+    pos_filter: PartOfSpeechFilter
+    svm: SvmType
+    n_jobs: Optional[int]
+    tokenizer: TokenizerType
+
+    def __init__(
+            self,
+            batch_size: int = 256,
+            processes: int = 1,
+            svm: SvmType = SvmType.kernel,
+            n_jobs: Optional[int] = -1,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+    ):
+        """
+        :param batch_size: Number of texts per part-of-speech tagging batch.
+        :param processes: Number of part-of-speech tagging processes.
+        :param svm: Support vector machine type.
+        :param n_jobs: Number of ensemble members to fit and predict
+        in parallel. If -1, use all processors.
+        :param tokenizer: Tokenizer backend.
+        """
+        self.pos_filter = PartOfSpeechFilter(
+            batch_size=batch_size,
+            processes=processes,
+        )
+        self.svm = svm
+        self.n_jobs = n_jobs
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "ensemble-bow-pos"
+        return f"ensemble-bow-pos{self.svm.slug_suffix}" \
+               f"{tokenizer_suffix(self.tokenizer)}"
 
     def prepare(self) -> None:
         # Install NLTK punctuation for tokenization.
-        if not downloader.is_installed("punkt"):
-            downloader.download("punkt")
-        # Install English spaCy model.
-        if not is_package("en_core_web_sm"):
-            system("python -m spacy download en_core_web_sm")
-        self.language = spacy_load("en_core_web_sm")
+        require_tokenizer()
+        # Load English spaCy model.
+        self.pos_filter.prepare()
 
     def get_token_by_pos(self, text: str) -> str:
-        doc = self.language(text)
-        pos_list = []
-        selected_pos = ["ADJ", "ADV", "AUX", "NOUN", "PRON", "PROPN", "VERB"]
-        for token in doc:
-            if token.pos_ in selected_pos:
-                pos_list.append(token.text)
-        return " ".join(pos_list)
+        return self.pos_filter.filter(text)
 
     def load_model(self, path: Path) -> bool:
         if self.model is not None and self.encoder is not None:
             return True
-        if not path.exists() or not path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        with path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def get_texts(self, train_data: LabelledDataset) -> List[str]:
-        stemmer = SnowballStemmer("english")
+        english_stemmer = stemmer("english")
+        tokenizer = get_tokenizer(self.tokenizer)
+        # Tag each unique text once, in batches.
+        filtered_texts = self.pos_filter.filter_texts(
+            [arg.text for arg in train_data.arguments_sorted] +
+            [kp.text for kp in train_data.key_points_sorted]
+        )
         train_texts: List[str] = []
         print("Token selection by POS")
-        for i in tqdm(range(len(list(train_data.labels.items())))):
-            (arg_id, kp_id), label = list(train_data.labels.items())[i]
-            arg = next(arg for arg in train_data.arguments if arg.id == arg_id)
-            kp = next(kp for kp in train_data.key_points if kp.id == kp_id)
+        for (arg_id, kp_id), label in tqdm(train_data.labels.items()):
+            arg = train_data.arguments_by_id[arg_id]
+            kp = train_data.key_points_by_id[kp_id]
             arg_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(arg.text))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(filtered_texts[arg.text])
             ]
             kp_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(kp.text))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(filtered_texts[kp.text])
             ]
 
             text = " ".join(arg_terms) + ". " + " ".join(kp_terms)
@@ -248,7 +449,12 @@ class EnsemblePartOfSpeechMatcher(Matcher):
 
         self.train_encoder(train_data)
 
-        train_features = self.encoder.transform(self.get_texts(train_data))
+        train_features = transform_cached(
+            self.encoder,
+            pair_texts(labelled_pairs(train_data)),
+            (str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_texts(train_data),
+        )
         train_labels = array(list(train_data.labels.values()))
 
         log_regression = LogisticRegression(
@@ -258,94 +464,139 @@ class EnsemblePartOfSpeechMatcher(Matcher):
             max_iter=2000,
             # random_state=42,
         )
-        svc = SVC(probability=True)
+        svc = svm_classifier(self.svm)
         self.model = VotingClassifier(
             estimators=[("lr", log_regression), ("svc", svc)],
             voting="soft",
             weights=[0.45, 0.55],
+            # Fit members in parallel processes. Large feature arrays
+            # are memory-mapped and shared by the workers, not copied.
+            n_jobs=self.n_jobs,
         )
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = self.get_texts(train_data)
-        self.encoder = CountVectorizer()  # token_pattern="^[a-zA-Z]{3,7}$")
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            CountVectorizer(),  # token_pattern="^[a-zA-Z]{3,7}$")
+            pair_texts(labelled_pairs(train_data)),
+            (str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_texts(train_data),
+        )
+
+    @staticmethod
+    def get_input_text(argument: Argument, key_point: KeyPoint) -> str:
+        return argument.text + ". " + key_point.text
+
+    def get_features_text(
+            self,
+            argument: Argument,
+            key_point: KeyPoint,
+    ) -> str:
+        input_text = self.get_input_text(argument, key_point)
+        return self.stem_text(self.get_token_by_pos(input_text))
+
+    def stem_text(self, text: str) -> str:
+        english_stemmer = stemmer("english")
+        return " ".join(
+            english_stemmer.stem(term)
+            for term in get_tokenizer(self.tokenizer).tokenize(text)
+        )
+
+    def get_features_texts(
+            self,
+            pairs: List[Tuple[Argument, KeyPoint]],
+    ) -> List[str]:
+        # Tag each unique input text once, in batches.
+        input_texts = [self.get_input_text(arg, kp) for arg, kp in pairs]
+        filtered_texts = self.pos_filter.filter_texts(input_texts)
+        return [self.stem_text(filtered_texts[text]) for text in input_texts]
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = argument.text + ". " + key_point.text
-        input_text = self.get_token_by_pos(input_text)
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
-        )
-        features = self.encoder.transform([input_text]).toarray()
+        input_text = self.get_features_text(argument, key_point)
+        features = self.encoder.transform([input_text])
         # Predict label and probability with pretrained model.
         probability = self.model.predict_proba(features)
         score = probability[0][1]  # get probability of class 1
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        pairs = candidate_pairs(data)
+        features = transform_cached(
+            self.encoder,
+            [self.get_input_text(arg, kp) for arg, kp in pairs],
+            ("input", str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_features_texts(pairs),
+        )
+        return predict_features(pairs, features, self.model)
 
 
 class RegressionPartOfSpeechMatcher(Matcher):
     model: LogisticRegression = None
     encoder: CountVectorizer = None
-    language: Language
+    pos_filter: PartOfSpeechFilter
+    tokenizer: TokenizerType
+
+    def __init__(
+            self,
+            batch_size: int = 256,
+            processes: int = 1,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+    ):
+        """
+        :param batch_size: Number of texts per part-of-speech tagging batch.
+        :param processes: Number of part-of-speech tagging processes.
+        :param tokenizer: Tokenizer backend.
+        """
+        self.pos_filter = PartOfSpeechFilter(
+            batch_size=batch_size,
+            processes=processes,
+        )
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "regression-bow-pos"
+        return f"regression-bow-pos{tokenizer_suffix(self.tokenizer)}"
 
     def prepare(self) -> None:
         print("checked preprare")
-        if not is_package("en_core_web_sm"):
-            system("python -m spacy download en_core_web_sm")
-        self.language = spacy_load("en_core_web_sm")
-        return
+        self.pos_filter.prepare()
 
     def get_token_by_pos(self, text: str) -> str:
-        doc = self.language(text)
-        pos_list = []
-        selected_pos = ["ADJ", "ADV", "AUX", "NOUN", "PRON", "PROPN", "VERB"]
-        for token in doc:
-            if token.pos_ in selected_pos:
-                pos_list.append(token.text)
-        return " ".join(pos_list)
+        return self.pos_filter.filter(text)
 
     def load_model(self, path: Path) -> bool:
         if self.model is not None and self.encoder is not None:
             return True
-        if not path.exists() or not path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        with path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def get_texts(self, train_data: LabelledDataset) -> List[str]:
-        stemmer = SnowballStemmer("english")
+        english_stemmer = stemmer("english")
+        tokenizer = get_tokenizer(self.tokenizer)
+        # Tag each unique text once, in batches.
+        filtered_texts = self.pos_filter.filter_texts(
+            [arg.text for arg in train_data.arguments_sorted] +
+            [kp.text for kp in train_data.key_points_sorted]
+        )
         train_texts: List[str] = []
         print("Token selection by POS")
         for (arg_id, kp_id), label in tqdm(train_data.labels.items()):
-            arg = next(arg for arg in train_data.arguments if arg.id == arg_id)
-            kp = next(kp for kp in train_data.key_points if kp.id == kp_id)
+            arg = train_data.arguments_by_id[arg_id]
+            kp = train_data.key_points_by_id[kp_id]
             arg_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(arg.text))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(filtered_texts[arg.text])
             ]
             kp_terms = [
-                stemmer.stem(term)
-                for term in word_tokenize(self.get_token_by_pos(kp.text))
+                english_stemmer.stem(term)
+                for term in tokenizer.tokenize(filtered_texts[kp.text])
             ]
 
             text = " ".join(arg_terms) + ". " + " ".join(kp_terms)
@@ -361,7 +612,12 @@ class RegressionPartOfSpeechMatcher(Matcher):
 
         self.train_encoder(train_data)
 
-        train_features = self.encoder.transform(self.get_texts(train_data))
+        train_features = transform_cached(
+            self.encoder,
+            pair_texts(labelled_pairs(train_data)),
+            (str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_texts(train_data),
+        )
         train_labels = array(list(train_data.labels.values()))
 
         log_regression = LogisticRegression(
@@ -375,58 +631,104 @@ class RegressionPartOfSpeechMatcher(Matcher):
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = self.get_texts(train_data)
-        self.encoder = CountVectorizer()  # token_pattern="^[a-zA-Z]{3,7}$")
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            CountVectorizer(),  # token_pattern="^[a-zA-Z]{3,7}$")
+            pair_texts(labelled_pairs(train_data)),
+            (str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_texts(train_data),
+        )
+
+    @staticmethod
+    def get_input_text(argument: Argument, key_point: KeyPoint) -> str:
+        return argument.text + ". " + key_point.text
+
+    def get_features_text(
+            self,
+            argument: Argument,
+            key_point: KeyPoint,
+    ) -> str:
+        input_text = self.get_input_text(argument, key_point)
+        return self.stem_text(self.get_token_by_pos(input_text))
+
+    def stem_text(self, text: str) -> str:
+        english_stemmer = stemmer("english")
+        return " ".join(
+            english_stemmer.stem(term)
+            for term in get_tokenizer(self.tokenizer).tokenize(text)
+        )
+
+    def get_features_texts(
+            self,
+            pairs: List[Tuple[Argument, KeyPoint]],
+    ) -> List[str]:
+        # Tag each unique input text once, in batches.
+        input_texts = [self.get_input_text(arg, kp) for arg, kp in pairs]
+        filtered_texts = self.pos_filter.filter_texts(input_texts)
+        return [self.stem_text(filtered_texts[text]) for text in input_texts]
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = argument.text + ". " + key_point.text
-        input_text = self.get_token_by_pos(input_text)
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
-        )
-        features = self.encoder.transform([input_text]).toarray()
+        input_text = self.get_features_text(argument, key_point)
+        features = self.encoder.transform([input_text])
         # Predict label and probability with pretrained model.
         probability = self.model.predict_proba(features)
         score = probability[0][1]  # get probability of class 1
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        pairs = candidate_pairs(data)
+        features = transform_cached(
+            self.encoder,
+            [self.get_input_text(arg, kp) for arg, kp in pairs],
+            ("input", str(self.tokenizer), *self.pos_filter.config),
+            lambda: self.get_features_texts(pairs),
+        )
+        return predict_features(pairs, features, self.model)
 
 
 class EnsembleVotingMatcher(Matcher):
     model: VotingClassifier = None
     encoder: CountVectorizer = None
+    svm: SvmType
+    n_jobs: Optional[int]
+    tokenizer: TokenizerType
+
+    def __init__(
+            self,
+            svm: SvmType = SvmType.kernel,
+            n_jobs: Optional[int] = -1,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+    ):
+        """
+        :param svm: Support vector machine type.
+        :param n_jobs: Number of ensemble members to fit and predict
+        in parallel. If -1, use all processors.
+        :param tokenizer: Tokenizer backend.
+        """
+        self.svm = svm
+        self.n_jobs = n_jobs
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "ensemble-bow-voting"
+        return f"ensemble-bow-voting{self.svm.slug_suffix}" \
+               f"{tokenizer_suffix(self.tokenizer)}"
 
     def prepare(self) -> None:
         # Install NLTK punctuation for tokenization.
-        if not downloader.is_installed("punkt"):
-            downloader.download("punkt")
+        require_tokenizer()
 
     def load_model(self, path: Path) -> bool:
         if self.model is not None and self.encoder is not None:
             return True
-        if not path.exists() or not path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        with path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def train(
             self,
@@ -441,7 +743,12 @@ class EnsembleVotingMatcher(Matcher):
         """
         self.train_encoder(train_data)
 
-        train_features = self.encoder.transform(get_texts(train_data))
+        train_features = get_pair_features(
+            self.encoder,
+            labelled_pairs(train_data),
+            self.tokenizer,
+            cache=True,
+        )
         train_labels = array(list(train_data.labels.values()))
 
         log_regression = LogisticRegression(
@@ -451,79 +758,289 @@ class EnsembleVotingMatcher(Matcher):
             max_iter=2000,
             # random_state=42,
         )
-        svc = SVC(probability=True)
+        svc = svm_classifier(self.svm)
         self.model = VotingClassifier(
             estimators=[("lr", log_regression), ("svc", svc)],
             voting="soft",
             weights=[0.55, 0.45],
+            # Fit members in parallel processes. Large feature arrays
+            # are memory-mapped and shared by the workers, not copied.
+            n_jobs=self.n_jobs,
         )
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = get_texts(train_data)
-        self.encoder = CountVectorizer()  # token_pattern="^[a-zA-Z]{3,7}$")
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            CountVectorizer(),  # token_pattern="^[a-zA-Z]{3,7}$")
+            pair_texts(labelled_pairs(train_data)),
+            texts_config(self.tokenizer),
+            lambda: get_texts(train_data, self.tokenizer),
+        )
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = argument.text + " " + key_point.text
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
+        features = get_pair_features(
+            self.encoder,
+            [(argument, key_point)],
+            self.tokenizer,
         )
-        features = self.encoder.transform([input_text]).toarray()
         # Predict label and probability with pretrained model.
         probability = self.model.predict_proba(features)
         score = probability[0][1]  # get probability of class 1
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
-
-
-def get_texts(train_data: LabelledDataset) -> List[str]:
-    stemmer = SnowballStemmer("english")
+        pairs = candidate_pairs(data)
+        features = get_pair_features(
+            self.encoder,
+            pairs,
+            self.tokenizer,
+            cache=True,
+        )
+        return predict_features(pairs, features, self.model)
+
+
+def get_texts(
+        train_data: LabelledDataset,
+        tokenizer: TokenizerType = TokenizerType.nltk,
+) -> List[str]:
+    # Tokenize and stem each unique text once, in parallel.
+    texts = [arg.text for arg in train_data.arguments_sorted]
+    texts.extend(kp.text for kp in train_data.key_points_sorted)
+    preprocessed = preprocess_texts(
+        texts,
+        language="english",
+        stemming=True,
+        tokenizer=tokenizer,
+    )
     train_texts: List[str] = []
     for (arg_id, kp_id), label in train_data.labels.items():
-        arg = next(arg for arg in train_data.arguments if arg.id == arg_id)
-        kp = next(kp for kp in train_data.key_points if kp.id == kp_id)
-        arg_terms = [stemmer.stem(term) for term in word_tokenize(arg.text)]
-        kp_terms = [stemmer.stem(term) for term in word_tokenize(kp.text)]
+        arg = train_data.arguments_by_id[arg_id]
+        kp = train_data.key_points_by_id[kp_id]
+        arg_terms = preprocessed.terms(arg.text)
+        kp_terms = preprocessed.terms(kp.text)
         text = " ".join(arg_terms) + " " + " ".join(kp_terms)
         train_texts.append(text)
     return train_texts
 
 
+def candidate_pairs(data: Dataset) -> List[Tuple[Argument, KeyPoint]]:
+    """
+    All pairs of arguments and key points with the same topic and stance.
+    """
+    return [
+        (arg, kp)
+        for args, kps in data.groups.values()
+        for arg in args
+        for kp in kps
+    ]
+
+
+# Maximum number of pairs to predict at once.
+_predict_chunk_size = 10_000
+
+
+def predict_features(
+        pairs: List[Tuple[Argument, KeyPoint]],
+        features: csr_matrix,
+        model: ClassifierMixin,
+        probability: bool = True,
+        chunk_size: int = _predict_chunk_size,
+) -> Labels:
+    """
+    Predict scores for many pairs at once from precomputed sparse features,
+    with a single prediction call per chunk of rows.
+    """
+    scores: List[ndarray] = [
+        _predict_scores(
+            model,
+            features[start:start + chunk_size],
+            probability,
+        )
+        for start in range(0, features.shape[0], chunk_size)
+    ]
+    return {
+        (arg.id, kp.id): float(score)
+        for (arg, kp), score in zip(pairs, chain.from_iterable(scores))
+    }
+
+
+def _predict_scores(
+        model: ClassifierMixin,
+        features: csr_matrix,
+        probability: bool,
+) -> ndarray:
+    if probability and isinstance(model, VotingClassifier) and \
+            model.voting == "soft":
+        return soft_voting_probabilities(model, features)
+    elif probability:
+        # Get probability of class 1.
+        return model.predict_proba(features)[:, 1]
+    else:
+        return model.predict(features)
+
+
+def soft_voting_probabilities(
+        model: VotingClassifier,
+        features: csr_matrix,
+) -> ndarray:
+    """
+    Predict match probabilities of a soft voting ensemble for a batch
+    of pairs, with the members predicting in parallel threads.
+    Scikit-learn's voting classifier calls its members one after another.
+    Members predict with BLAS, LIBLINEAR, or LIBSVM routines that
+    release the GIL, so threads share the features without copying them.
+    :return: Probability of class 1 for each row.
+    """
+    probabilities = Parallel(n_jobs=model.n_jobs, prefer="threads")(
+        delayed(estimator.predict_proba)(features)
+        for estimator in model.estimators_
+    )
+    return average(probabilities, axis=0, weights=model.weights)[:, 1]
+
+
+def get_pair_features(
+        encoder: Vectorizer,
+        pairs: List[Tuple[Argument, KeyPoint]],
+        tokenizer: TokenizerType = TokenizerType.nltk,
+        cache: bool = False,
+        processes: Optional[int] = None,
+        executor: Optional[Executor] = None,
+) -> csr_matrix:
+    """
+    Compose sparse features of argument key point pairs
+    from the features of each unique argument and key point text.
+    Features are equal to encoding the texts from `get_texts`
+    with the same tokenizer.
+    :param tokenizer: Tokenizer backend.
+    :param processes: Maximum number of preprocessing processes
+    if no executor is given.
+    If None, use as many processes as CPUs are available.
+    :param executor: Existing process pool for preprocessing.
+    :param cache: If true, load features from the on-disk cache if
+    the same pairs were encoded before, e.g., for another classifier.
+    Only enable for batches, as each call hashes the encoder's vocabulary
+    and writes a new file to the unbounded cache.
+    """
+    composer = PairFeatureComposer(
+        encoder,
+        tokenizer=tokenizer,
+        processes=processes,
+        executor=executor,
+        cache=cache,
+    )
+    return composer.transform([(arg.text, kp.text) for arg, kp in pairs])
+
+
+def pair_texts(pairs: Iterable[Tuple[Argument, KeyPoint]]) -> Iterator[str]:
+    """
+    Argument and key point texts of all pairs, e.g., for cache keys.
+    """
+    for arg, kp in pairs:
+        yield arg.text
+        yield kp.text
+
+
+def fit_cached_encoder(
+        encoder: Vectorizer,
+        key_texts: Iterable[str],
+        config: Tuple,
+        texts: Callable[[], List[str]],
+) -> Vectorizer:
+    """
+    Fit an encoder on preprocessed texts, or load the encoder
+    from the feature cache if it was fitted on the same input texts
+    with the same preprocessing before.
+    :param key_texts: Input texts before preprocessing.
+    :param config: Preprocessing options.
+    :param texts: Function returning the preprocessed texts,
+    called only if the encoder isn't cached.
+    """
+    key = features_key(
+        key_texts, "encoder", *config, encoder_fingerprint(encoder),
+    )
+
+    def fit() -> Vectorizer:
+        encoder.fit(texts())
+        return encoder
+
+    return load_cached_encoder(key, fit)
+
+
+def transform_cached(
+        encoder: Vectorizer,
+        key_texts: Iterable[str],
+        config: Tuple,
+        texts: Callable[[], List[str]],
+) -> csr_matrix:
+    """
+    Encode preprocessed texts, or load the features from the feature cache
+    if the same input texts were encoded with the same preprocessing
+    and encoder before.
+    :param key_texts: Input texts before preprocessing.
+    :param config: Preprocessing options.
+    :param texts: Function returning the preprocessed texts,
+    called only if the features aren't cached.
+    """
+    key = features_key(
+        key_texts, "features", *config, encoder_fingerprint(encoder),
+    )
+    return load_cached_features(key, lambda: encoder.transform(texts()))
+
+
+def texts_config(tokenizer: TokenizerType) -> Tuple:
+    """
+    Preprocessing options of `get_texts`, e.g., for cache keys.
+    """
+    return "english", True, str(tokenizer)
+
+
+def tokenizer_suffix(tokenizer: TokenizerType) -> str:
+    return f"-{tokenizer}" if tokenizer != TokenizerType.nltk else ""
+
+
+def labelled_pairs(
+        data: LabelledDataset
+) -> List[Tuple[Argument, KeyPoint]]:
+    """
+    Argument key point pairs of all labels, in the order of the labels.
+    """
+    return [
+        (data.arguments_by_id[arg_id], data.key_points_by_id[kp_id])
+        for arg_id, kp_id in data.labels.keys()
+    ]
+
+
 class RegressionTfidfMatcher(Matcher):
     model: LogisticRegression = None
     encoder: TfidfVectorizer = None
+    tokenizer: TokenizerType
+
+    def __init__(self, tokenizer: TokenizerType = TokenizerType.nltk):
+        """
+        :param tokenizer: Tokenizer backend.
+        """
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "regression-tfidf"
+        return f"regression-tfidf{tokenizer_suffix(self.tokenizer)}"
 
     def prepare(self) -> None:
         # Install NLTK punctuation for tokenization.
-        if not downloader.is_installed("punkt"):
-            downloader.download("punkt")
+        require_tokenizer()
 
     def load_model(self, path: Path) -> bool:
         if self.model is not None and self.encoder is not None:
             return True
-        if not path.exists() or not path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        with path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def train(
             self,
@@ -538,7 +1055,12 @@ class RegressionTfidfMatcher(Matcher):
         """
         self.train_encoder(train_data)
 
-        train_features = self.encoder.transform(get_texts(train_data))
+        train_features = get_pair_features(
+            self.encoder,
+            labelled_pairs(train_data),
+            self.tokenizer,
+            cache=True,
+        )
         train_labels = array(list(train_data.labels.values()))
 
         log_regression = LogisticRegression(
@@ -552,30 +1074,34 @@ class RegressionTfidfMatcher(Matcher):
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = get_texts(train_data)
-        self.encoder = TfidfVectorizer()
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            TfidfVectorizer(),
+            pair_texts(labelled_pairs(train_data)),
+            texts_config(self.tokenizer),
+            lambda: get_texts(train_data, self.tokenizer),
+        )
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = argument.text + " " + key_point.text
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
+        features = get_pair_features(
+            self.encoder,
+            [(argument, key_point)],
+            self.tokenizer,
         )
-        features = self.encoder.transform([input_text]).toarray()
         # Predict label and probability with pretrained model.
         probability = self.model.predict_proba(features)
         score = probability[0][1]  # get probability of class 1
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        pairs = candidate_pairs(data)
+        features = get_pair_features(
+            self.encoder,
+            pairs,
+            self.tokenizer,
+            cache=True,
+        )
+        return predict_features(pairs, features, self.model)
 
 
 class RegressionBagOfWordsMatcher(Matcher):
@@ -586,33 +1112,33 @@ class RegressionBagOfWordsMatcher(Matcher):
 
     model: LogisticRegression = None
     encoder: CountVectorizer = None
+    tokenizer: TokenizerType
+
+    def __init__(self, tokenizer: TokenizerType = TokenizerType.nltk):
+        """
+        :param tokenizer: Tokenizer backend.
+        """
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "regression-bow"
+        return f"regression-bow{tokenizer_suffix(self.tokenizer)}"
 
     def prepare(self) -> None:
         # Install NLTK punctuation for tokenization.
-        if not downloader.is_installed("punkt"):
-            downloader.download("punkt")
+        require_tokenizer()
 
     def load_model(self, path: Path) -> bool:
-        file_path = path / self.name
         if self.model is not None and self.encoder is not None:
             return True
-        if not file_path.exists() or not file_path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with file_path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        matcher_path = path.parent.absolute()
-        matcher_path.mkdir(exist_ok=True)
-        path.mkdir(exist_ok=True)
-        file_path = path / self.name
-        with file_path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def train(
             self,
@@ -627,7 +1153,12 @@ class RegressionBagOfWordsMatcher(Matcher):
         """
         self.train_encoder(train_data)
 
-        train_features = self.encoder.transform(get_texts(train_data))
+        train_features = get_pair_features(
+            self.encoder,
+            labelled_pairs(train_data),
+            self.tokenizer,
+            cache=True,
+        )
         train_labels = array(list(train_data.labels.values()))
 
         log_regression = LogisticRegression(
@@ -641,52 +1172,70 @@ class RegressionBagOfWordsMatcher(Matcher):
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = get_texts(train_data)
-        self.encoder = CountVectorizer()
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            CountVectorizer(),
+            pair_texts(labelled_pairs(train_data)),
+            texts_config(self.tokenizer),
+            lambda: get_texts(train_data, self.tokenizer),
+        )
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = argument.text + " " + key_point.text
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
+        features = get_pair_features(
+            self.encoder,
+            [(argument, key_point)],
+            self.tokenizer,
         )
-        features = self.encoder.transform([input_text]).toarray()
         # Predict label and probability with pretrained model.
         probability = self.model.predict_proba(features)
         score = probability[0][1]  # get probability of class 1
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        pairs = candidate_pairs(data)
+        features = get_pair_features(
+            self.encoder,
+            pairs,
+            self.tokenizer,
+            cache=True,
+        )
+        return predict_features(pairs, features, self.model)
 
 
 class SVCBagOfWordsMatcher(Matcher):
-    model: SVC = None
+    model: ClassifierMixin = None
     encoder: CountVectorizer = None
+    svm: SvmType
+    tokenizer: TokenizerType
+
+    def __init__(
+            self,
+            svm: SvmType = SvmType.kernel,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+    ):
+        """
+        :param svm: Support vector machine type.
+        :param tokenizer: Tokenizer backend.
+        """
+        self.svm = svm
+        self.tokenizer = tokenizer
 
     @property
     def slug(self) -> str:
-        return "svc-bow"
+        return f"svc-bow{self.svm.slug_suffix}" \
+               f"{tokenizer_suffix(self.tokenizer)}"
 
     def load_model(self, path: Path) -> bool:
         if self.model is not None and self.encoder is not None:
             return True
-        if not path.exists() or not path.is_file():
+        loaded = load_sklearn_model(path)
+        if loaded is None:
             return False
-        with path.open("rb") as file:
-            self.model, self.encoder = load(file)
-            return True
+        self.model, self.encoder = loaded
+        return True
 
     def save_model(self, path: Path):
-        with path.open("wb") as file:
-            dump((self.model, self.encoder), file)
+        save_sklearn_model(path, self.model, self.encoder)
 
     def train(
             self,
@@ -700,34 +1249,240 @@ class SVCBagOfWordsMatcher(Matcher):
         classifiers have different weights for prediction.
         """
         self.train_encoder(train_data)
-        train_features = self.encoder.transform(get_texts(train_data))
+        train_features = get_pair_features(
+            self.encoder,
+            labelled_pairs(train_data),
+            self.tokenizer,
+            cache=True,
+        )
         train_labels = array(list(train_data.labels.values()))
-        svc = SVC(probability=True)
+        svc = svm_classifier(self.svm)
         self.model = svc
         self.model.fit(train_features, train_labels)
 
     def train_encoder(self, train_data: LabelledDataset):
-        train_texts = get_texts(train_data)
-        self.encoder = CountVectorizer()
-        self.encoder.fit_transform(train_texts)
+        self.encoder = fit_cached_encoder(
+            CountVectorizer(),
+            pair_texts(labelled_pairs(train_data)),
+            texts_config(self.tokenizer),
+            lambda: get_texts(train_data, self.tokenizer),
+        )
 
     def get_match_probability(self, argument: Argument, key_point: KeyPoint):
         # Transform input text to numeric features.
-        stemmer = SnowballStemmer("english")
-        input_text = argument.text + " " + key_point.text
-        input_text = " ".join(
-            [stemmer.stem(term) for term in word_tokenize(input_text)]
+        features = get_pair_features(
+            self.encoder,
+            [(argument, key_point)],
+            self.tokenizer,
         )
-        features = self.encoder.transform([input_text]).toarray()
         # Predict label and probability with pretrained model.
         probability = self.model.predict_proba(features)
         score = probability[0][1]  # get probability of class 1
         return score
 
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.get_match_probability(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        pairs = candidate_pairs(data)
+        features = get_pair_features(
+            self.encoder,
+            pairs,
+            self.tokenizer,
+            cache=True,
+        )
+        return predict_features(pairs, features, self.model)
+
+
+# Type alias for a chunk of labelled argument key point pairs.
+LabelledPairs = List[Tuple[Argument, KeyPoint, Label]]
+
+
+def chunk_labels(labels: Labels, chunk_size: int) -> Iterator[Labels]:
+    """
+    Split in-memory labels into chunks of at most the given size.
+    """
+    items = iter(labels.items())
+    chunk = dict(islice(items, chunk_size))
+    while len(chunk) > 0:
+        yield chunk
+        chunk = dict(islice(items, chunk_size))
+
+
+def labelled_pair_chunks(
+        data: Dataset,
+        labels_chunks: Iterable[Labels],
+) -> Iterator[LabelledPairs]:
+    """
+    Resolve chunks of labels, e.g., streamed with
+    `Pipeline.load_labels_chunks`, to labelled argument key point pairs.
+    """
+    for labels in labels_chunks:
+        yield [
+            (
+                data.arguments_by_id[arg_id],
+                data.key_points_by_id[kp_id],
+                label,
+            )
+            for (arg_id, kp_id), label in labels.items()
+        ]
+
+
+class StreamingRegressionMatcher(Matcher):
+    """
+    Logistic regression on hashed bag-of-words features,
+    trained out of core with stochastic gradient descent.
+    The stateless hashing vectorizer needs no vocabulary, and the model
+    is updated with `partial_fit` chunk by chunk, such that memory usage
+    is bounded by the chunk size, not by the number of labelled pairs.
+    If a labels file is given, training labels are streamed from that file
+    in chunks, instead of being taken from the loaded training dataset.
+    """
+
+    features_count: int
+    chunk_size: int
+    epochs: int
+    alpha: float
+    seed: Optional[int]
+    labels_file: Optional[Path]
+    processes: Optional[int]
+    model: SGDClassifier = None
+    encoder: HashingVectorizer
+    tokenizer: TokenizerType
+
+    def __init__(
+            self,
+            features_count: int = 2 ** 20,
+            chunk_size: int = 10_000,
+            epochs: int = 1,
+            alpha: float = 1e-5,
+            seed: Optional[int] = 42,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+            labels_file: Optional[Path] = None,
+            processes: Optional[int] = None,
+    ):
+        """
+        :param features_count: Number of hashed features.
+        :param chunk_size: Number of labelled pairs per training step.
+        :param epochs: Number of passes over the training pairs.
+        :param alpha: L2 regularization strength.
+        :param tokenizer: Tokenizer backend.
+        :param labels_file: CSV file of the training labels to stream,
+        read once per epoch. If None, chunk the training dataset's labels.
+        :param processes: Number of preprocessing processes, shared by
+        all chunks. If None, use as many processes as CPUs are available.
+        """
+        self.features_count = features_count
+        self.chunk_size = chunk_size
+        self.epochs = epochs
+        self.alpha = alpha
+        self.seed = seed
+        self.tokenizer = tokenizer
+        self.labels_file = labels_file
+        self.processes = processes
+        # Count terms without normalization, such that counts of
+        # argument and key point texts can be added.
+        self.encoder = HashingVectorizer(
+            n_features=features_count,
+            alternate_sign=False,
+            norm=None,
+        )
+
+    @property
+    def slug(self) -> str:
+        return f"regression-hashing-sgd-{self.epochs}-epochs" \
+               f"{tokenizer_suffix(self.tokenizer)}"
+
+    def prepare(self) -> None:
+        require_tokenizer()
+
+    def load_model(self, path: Path) -> bool:
+        if self.model is not None and self.encoder is not None:
+            return True
+        loaded = load_sklearn_model(path)
+        if loaded is None:
+            return False
+        self.model, self.encoder = loaded
+        return True
+
+    def save_model(self, path: Path):
+        save_sklearn_model(path, self.model, self.encoder)
+
+    def get_features(
+            self,
+            pairs: List[Tuple[Argument, KeyPoint]],
+            executor: Optional[Executor] = None,
+    ) -> csr_matrix:
+        features = get_pair_features(
+            self.encoder,
+            pairs,
+            self.tokenizer,
+            cache=False,
+            processes=self.processes,
+            executor=executor,
+        )
+        return normalize(features, copy=False)
+
+    def _process_pool(self):
+        """
+        Process pool shared by all chunks, or no pool
+        if preprocessing should run in the main process.
+        """
+        if self.processes is not None and self.processes <= 1:
+            return nullcontext(None)
+        return process_pool("english", True, self.processes)
+
+    def train(
+            self,
+            train_data: LabelledDataset,
+            dev_data: LabelledDataset,
+            cache_path: Path,
+    ):
+        if self.labels_file is not None:
+            # Import here to avoid circular import.
+            from modern_talking.pipeline import Pipeline
+
+            self.train_stream(lambda: labelled_pair_chunks(
+                train_data,
+                Pipeline.load_labels_chunks(
+                    self.labels_file,
+                    self.chunk_size,
+                ),
+            ))
+        else:
+            self.train_stream(lambda: labelled_pair_chunks(
+                train_data,
+                chunk_labels(train_data.labels, self.chunk_size),
+            ))
+
+    def train_stream(self, chunks: Callable[[], Iterable[LabelledPairs]]):
+        """
+        Train on a stream of labelled pair chunks.
+        :param chunks: Function returning a new iterable of chunks,
+        called once per epoch.
+        """
+        self.model = SGDClassifier(
+            loss="log_loss",
+            alpha=self.alpha,
+            random_state=self.seed,
+        )
+        with self._process_pool() as executor:
+            for epoch in range(self.epochs):
+                print(f"Epoch {epoch + 1}/{self.epochs}")
+                for chunk in tqdm(chunks()):
+                    features = self.get_features(
+                        [(arg, kp) for arg, kp, _ in chunk],
+                        executor,
+                    )
+                    labels = array([int(label) for _, _, label in chunk])
+                    self.model.partial_fit(features, labels, classes=[0, 1])
+
+    def predict(self, data: Dataset) -> Labels:
+        pairs = candidate_pairs(data)
+        labels: Labels = {}
+        with self._process_pool() as executor:
+            for start in range(0, len(pairs), self.chunk_size):
+                chunk = pairs[start:start + self.chunk_size]
+                labels.update(predict_features(
+                    chunk,
+                    self.get_features(chunk, executor),
+                    self.model,
+                ))
+        return labels
@@ -0,0 +1,80 @@
+from functools import lru_cache
+from typing import FrozenSet
+
+from nltk.corpus import stopwords, wordnet
+from nltk.corpus.reader import WordNetCorpusReader
+from nltk.downloader import Downloader
+from nltk.stem import SnowballStemmer
+
+# Shared NLP resources, loaded lazily and at most once per process.
+# Worker processes load their own copies on first use, such that
+# no resources are loaded again for each text or pair.
+
+
+@lru_cache(maxsize=1)
+def _downloader() -> Downloader:
+    return Downloader()
+
+
+@lru_cache(maxsize=None)
+def require_nltk_resource(name: str) -> None:
+    """
+    Download an NLTK resource if it is not installed yet.
+    The installation is checked only once per process.
+    """
+    downloader = _downloader()
+    if not downloader.is_installed(name):
+        downloader.download(name)
+
+
+def require_tokenizer() -> None:
+    """
+    Download the models of NLTK's default word tokenizer.
+    """
+    require_nltk_resource("punkt")
+
+
+def require_augmenter() -> None:
+    """
+    Download the NLTK resources for WordNet synonym and antonym augmenters.
+    """
+    require_tokenizer()
+    require_nltk_resource("wordnet")
+    require_nltk_resource("averaged_perceptron_tagger")
+
+
+@lru_cache(maxsize=None)
+def stemmer(language: str = "english") -> SnowballStemmer:
+    """
+    Shared Snowball stemmer for a language.
+    """
+    return SnowballStemmer(language)
+
+
+@lru_cache(maxsize=None)
+def stop_words(language: str = "english") -> FrozenSet[str]:
+    """
+    Shared NLTK stop words list for a language.
+    """
+    require_nltk_resource("stopwords")
+    return frozenset(stopwords.words(language))
+
+
+@lru_cache(maxsize=1)
+def wordnet_corpus() -> WordNetCorpusReader:
+    """
+    Shared WordNet database, loaded once.
+    """
+    require_nltk_resource("wordnet")
+    wordnet.ensure_loaded()
+    return wordnet
+
+
+def initialize_worker(language: str, stemming: bool) -> None:
+    """
+    Load the stemmer once when a worker process starts.
+    Intended as a process pool initializer. Installed resources
+    are already checked by the main process, so they aren't checked again.
+    """
+    if stemming:
+        stemmer(language)
@@ -0,0 +1,208 @@
+from collections import Counter
+from enum import Enum
+from typing import Dict, Iterable, List, Sequence
+
+from numpy import array, ones, zeros, minimum, divide, int32, int64, \
+    float64, ndarray, cumsum, log, bincount, repeat, diff
+from scipy.sparse import csr_matrix, coo_matrix
+from sklearn.preprocessing import normalize
+
+
+class TermWeighting(str, Enum):
+    none = "none"
+    tfidf = "tfidf"
+    bm25 = "bm25"
+
+    def __str__(self):
+        # pylint: disable=invalid-str-returned
+        return self.value
+
+
+class TermVocabulary:
+    """
+    Mapping from terms to consecutive integer term IDs.
+    """
+
+    ids: Dict[str, int]
+
+    def __init__(self):
+        self.ids = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def encode(self, terms: Iterable[str]) -> List[int]:
+        """
+        Look up term IDs, adding unknown terms to the vocabulary.
+        """
+        return [self.ids.setdefault(term, len(self.ids)) for term in terms]
+
+
+def term_matrix(
+        term_ids: Sequence[Sequence[int]],
+        terms_count: int,
+        binary: bool = True,
+) -> csr_matrix:
+    """
+    Encode term IDs as rows of a CSR matrix.
+    :param term_ids: Term IDs for each row.
+    :param terms_count: Number of columns, i.e., the vocabulary size.
+    :param binary: If true, encode term sets, i.e., each term as 1.
+    Otherwise, encode term frequencies.
+    """
+    row_counts = [sorted(Counter(ids).items()) for ids in term_ids]
+    indptr = zeros(len(row_counts) + 1, dtype=int64)
+    indptr[1:] = cumsum([len(counts) for counts in row_counts])
+    indices = array(
+        [term_id for counts in row_counts for term_id, _ in counts],
+        dtype=int32,
+    )
+    if binary:
+        data = ones(len(indices), dtype=float64)
+    else:
+        data = array(
+            [count for counts in row_counts for _, count in counts],
+            dtype=float64,
+        )
+    return csr_matrix(
+        (data, indices, indptr),
+        shape=(len(row_counts), terms_count),
+    )
+
+
+def overlap_coefficients(
+        arg_matrix: csr_matrix,
+        kp_matrix: csr_matrix,
+) -> ndarray:
+    """
+    Compute the overlap coefficients of all pairs of argument and
+    key point term sets, encoded as binary term matrices
+    over the same vocabulary.
+    Intersections of all pairs are counted with a single sparse matrix
+    product and divided by the smaller set size of each pair.
+    Pairs with an empty term set have an overlap of 0.
+    :return: Dense matrix with arguments as rows and key points as columns.
+    """
+    intersections = (arg_matrix @ kp_matrix.T).toarray()
+    arg_sizes = arg_matrix.getnnz(axis=1)
+    kp_sizes = kp_matrix.getnnz(axis=1)
+    min_sizes = minimum.outer(arg_sizes, kp_sizes)
+    return divide(
+        intersections, min_sizes,
+        out=zeros(intersections.shape, dtype=float64),
+        where=min_sizes > 0,
+    )
+
+
+class TermIndex:
+    """
+    Inverted index from term IDs to the key points containing the term,
+    i.e., the transposed binary key point term matrix in CSR format.
+    """
+
+    postings: csr_matrix
+    kp_sizes: ndarray
+
+    def __init__(self, kp_matrix: csr_matrix):
+        self.postings = kp_matrix.T.tocsr()
+        self.kp_sizes = kp_matrix.getnnz(axis=1)
+
+    def overlap_coefficients(self, arg_matrix: csr_matrix) -> coo_matrix:
+        """
+        Compute overlap coefficients only for candidate pairs,
+        i.e., arguments and key points that share at least one term.
+        For each argument, the sparse matrix product only visits
+        the postings of the argument's terms.
+        All other pairs have an implicit overlap of 0.
+        :return: Sparse matrix with arguments as rows
+        and key points as columns.
+        """
+        intersections = (arg_matrix @ self.postings).tocoo()
+        arg_sizes = arg_matrix.getnnz(axis=1)
+        min_sizes = minimum(
+            arg_sizes[intersections.row],
+            self.kp_sizes[intersections.col],
+        )
+        return coo_matrix(
+            (intersections.data / min_sizes,
+             (intersections.row, intersections.col)),
+            shape=intersections.shape,
+        )
+
+
+def inverse_document_frequencies(
+        document_matrix: csr_matrix,
+        weighting: TermWeighting,
+) -> ndarray:
+    """
+    Compute inverse document frequencies for each term
+    of the documents' vocabulary, e.g., all texts of a topic.
+    For TF-IDF, use smoothed IDF like Scikit-learn does.
+    For BM25, use the non-negative IDF variant of Lucene.
+    """
+    documents = document_matrix.shape[0]
+    document_frequencies = bincount(
+        document_matrix.indices,
+        minlength=document_matrix.shape[1],
+    )
+    if weighting == TermWeighting.bm25:
+        return log(
+            (documents - document_frequencies + 0.5)
+            / (document_frequencies + 0.5)
+            + 1
+        )
+    else:
+        return log((documents + 1) / (document_frequencies + 1)) + 1
+
+
+def tfidf_cosine_similarities(
+        arg_counts: csr_matrix,
+        kp_counts: csr_matrix,
+        idf: ndarray,
+) -> csr_matrix:
+    """
+    Compute cosine similarities of TF-IDF weighted term vectors
+    for all pairs of arguments and key points, given term frequencies.
+    Only pairs that share at least one term are stored.
+    :return: Sparse matrix with arguments as rows and key points as columns.
+    """
+    arg_vectors = normalize(arg_counts.multiply(idf).tocsr())
+    kp_vectors = normalize(kp_counts.multiply(idf).tocsr())
+    return (arg_vectors @ kp_vectors.T).tocsr()
+
+
+def bm25_scores(
+        arg_counts: csr_matrix,
+        kp_counts: csr_matrix,
+        idf: ndarray,
+        average_length: float,
+        k1: float = 1.2,
+        b: float = 0.75,
+) -> csr_matrix:
+    """
+    Compute Okapi BM25 scores for all pairs of arguments and key points,
+    using the key point's terms as query and the argument as document.
+    Argument term weights are computed once per argument
+    and then matched against all key points with a sparse matrix product.
+    Only pairs that share at least one term are stored.
+    :return: Sparse matrix with arguments as rows and key points as columns.
+    """
+    arg_counts = arg_counts.tocsr()
+    lengths = array(arg_counts.sum(axis=1)).ravel()
+    if average_length <= 0:
+        average_length = 1
+    norms = k1 * (1 - b + b * lengths / average_length)
+    row_norms = repeat(norms, diff(arg_counts.indptr))
+    frequencies = arg_counts.data
+    weights = csr_matrix(
+        (
+            idf[arg_counts.indices] * frequencies * (k1 + 1)
+            / (frequencies + row_norms),
+            arg_counts.indices,
+            arg_counts.indptr,
+        ),
+        shape=arg_counts.shape,
+    )
+    kp_terms = kp_counts.copy()
+    kp_terms.data = ones(len(kp_terms.data), dtype=float64)
+    return (weights @ kp_terms.T).tocsr()
@@ -1,13 +1,23 @@
-from typing import Optional, Set
+from functools import lru_cache
+from typing import Optional, Set, FrozenSet, Callable, Tuple, List, Dict
 
 from nltk import StemmerI
-from nltk.corpus import stopwords, wordnet
-from nltk.downloader import Downloader
-from nltk.stem import SnowballStemmer
-from nltk.tokenize import word_tokenize
+from numpy import ndarray, array, concatenate, int64
 
 from modern_talking.matchers import UntrainedMatcher
-from modern_talking.model import Dataset, Labels, Argument, KeyPoint
+from modern_talking.matchers.preprocessing import PreprocessedTexts, \
+    preprocess_texts
+from modern_talking.matchers.resources import require_tokenizer, stemmer, \
+    stop_words as shared_stop_words, wordnet_corpus
+from modern_talking.matchers.tokenization import TokenizerType, \
+    get_tokenizer
+from modern_talking.matchers.term_index import TermVocabulary, term_matrix, \
+    overlap_coefficients, TermIndex, TermWeighting, \
+    inverse_document_frequencies, tfidf_cosine_similarities, bm25_scores
+from modern_talking.matchers.wordnet_expansion import ExpansionTable, \
+    load_expansion_table, wordnet_expansions
+from modern_talking.model import Dataset, Labels, Argument, KeyPoint, \
+    Topic
 from modern_talking.model import Label
 
 
@@ -16,8 +26,12 @@ class TermOverlapMatcher(UntrainedMatcher):
     Match argument key point pairs if their terms overlap.
     Synonyms, antonyms, stemming and stop words can be enabled
     to improve the matcher's performance.
+    Instead of the unweighted overlap coefficient, terms can be weighted
+    by TF-IDF (cosine similarity) or BM25,
+    with inverse document frequencies computed per topic.
 
     See https://en.wikipedia.org/wiki/Overlap_coefficient
+    See https://en.wikipedia.org/wiki/Okapi_BM25
     """
 
     language: str
@@ -25,8 +39,26 @@ class TermOverlapMatcher(UntrainedMatcher):
     use_antonyms: bool
     use_stop_words: bool
     use_custom_stop_words: bool
+    sparse: bool
+    tokenizer: TokenizerType
+    weighting: TermWeighting
+    bm25_k1: float
+    bm25_b: float
     stop_words: Optional[Set[str]] = None
     stemmer: Optional[StemmerI] = None
+    expansion_table: Optional[ExpansionTable] = None
+    tokens: Optional[PreprocessedTexts] = None
+    cache_size: Optional[int]
+    processes: Optional[int]
+    terms: Callable[[str], FrozenSet[str]]
+    term_ids: Callable[[str], Tuple[int, ...]]
+    # Vocabulary of preprocessed terms, e.g., stems.
+    term_vocabulary: TermVocabulary
+    # Preprocessed term ID of each token or expanded term,
+    # or -1 for stop words.
+    _token_term_ids: Dict[str, int]
+    # Preprocessed term IDs by the tokens' IDs in the tokens' vocabulary.
+    _token_term_id_array: Optional[ndarray] = None
 
     def __init__(
             self,
@@ -36,14 +68,48 @@ class TermOverlapMatcher(UntrainedMatcher):
             synonyms: bool = False,
             antonyms: bool = False,
             language: str = "english",
+            sparse: bool = False,
+            tokenizer: TokenizerType = TokenizerType.nltk,
+            weighting: TermWeighting = TermWeighting.none,
+            bm25_k1: float = 1.2,
+            bm25_b: float = 0.75,
+            cache_size: Optional[int] = 2 ** 16,
+            processes: Optional[int] = None,
     ):
+        """
+        :param sparse: If true, only score pairs that share at least
+        one term and omit all other pairs from the predicted labels,
+        i.e., predict an implicit score of 0.
+        :param tokenizer: Tokenizer backend. NLTK's word tokenizer
+        by default, or a faster regular expression tokenizer.
+        :param weighting: Term weighting scheme. Without weighting,
+        predict the overlap coefficient of the term sets.
+        :param bm25_k1: BM25 term frequency saturation parameter.
+        :param bm25_b: BM25 document length normalization parameter.
+        :param cache_size: Maximum number of texts for which preprocessed
+        terms are cached. If None, the cache is unbounded.
+        :param processes: Maximum number of processes for tokenization.
+        If None, use as many processes as CPUs are available.
+        """
         self.language = language
+        self.sparse = sparse
+        self.tokenizer = tokenizer
+        self.weighting = weighting
+        self.bm25_k1 = bm25_k1
+        self.bm25_b = bm25_b
         self.use_stop_words = stop_words
-        self.use_custom_stop_words = stopwords and custom_stop_words
+        self.use_custom_stop_words = stop_words and custom_stop_words
         self.use_synonyms = synonyms and language == "english"
         self.use_antonyms = antonyms and language == "english"
         if stemming:
-            self.stemmer = SnowballStemmer(language)
+            self.stemmer = stemmer(language)
+        self.cache_size = cache_size
+        self.processes = processes
+        # Preprocess each unique text only once.
+        self.terms = lru_cache(maxsize=cache_size)(self._terms)
+        self.term_ids = lru_cache(maxsize=cache_size)(self._term_ids)
+        self.term_vocabulary = TermVocabulary()
+        self._token_term_ids = {}
 
     @property
     def slug(self) -> str:
@@ -53,12 +119,24 @@ class TermOverlapMatcher(UntrainedMatcher):
             else ""
         synonyms_suffix = "-synonyms" if self.use_synonyms else ""
         antonyms_suffix = "-antonyms" if self.use_antonyms else ""
+        sparse_suffix = "-sparse" if self.sparse else ""
+        tokenizer_suffix = f"-{self.tokenizer}" \
+            if self.tokenizer != TokenizerType.nltk else ""
+        if self.weighting == TermWeighting.bm25:
+            weighting_suffix = f"-bm25-k1-{self.bm25_k1}-b-{self.bm25_b}"
+        elif self.weighting == TermWeighting.tfidf:
+            weighting_suffix = "-tfidf"
+        else:
+            weighting_suffix = ""
         return f"term-overlap-{self.language}" \
+               f"{tokenizer_suffix}" \
                f"{stemming_suffix}" \
                f"{stop_words_suffix}" \
                f"{custom_stop_words_suffix}" \
                f"{synonyms_suffix}" \
-               f"{antonyms_suffix}"
+               f"{antonyms_suffix}" \
+               f"{weighting_suffix}" \
+               f"{sparse_suffix}"
 
     @property
     def name(self) -> Optional[str]:
@@ -78,6 +156,12 @@ class TermOverlapMatcher(UntrainedMatcher):
             preprocessing.append("antonyms")
         if self.use_antonyms:
             preprocessing.append("Snowball stemmer")
+        if self.weighting == TermWeighting.tfidf:
+            preprocessing.append("TF-IDF weighting")
+        elif self.weighting == TermWeighting.bm25:
+            preprocessing.append("BM25 weighting")
+        if self.tokenizer == TokenizerType.regex:
+            preprocessing.append("regex tokenizer")
         preprocessing_suffix = f"\nPreprocessing: {', '.join(preprocessing)}" \
             if len(preprocessing) > 0 else ""
         return "Match argument key point pairs " \
@@ -89,67 +173,171 @@ class TermOverlapMatcher(UntrainedMatcher):
                f"{preprocessing_suffix}"
 
     def prepare(self) -> None:
-        downloader = Downloader()
-
         # Download dependencies for tokenizer.
-        if not downloader.is_installed("punkt"):
-            downloader.download("punkt")
+        require_tokenizer()
 
-        # Download stop words list.
+        # Load shared stop words list.
         if self.use_stop_words:
-            if not downloader.is_installed("stopwords"):
-                downloader.download("stopwords")
-            self.stop_words = set(stopwords.words(self.language))
+            self.stop_words = set(shared_stop_words(self.language))
             if self.use_custom_stop_words:
                 self.stop_words.remove("not")
 
-        # Download WordNet database.
-        if self.use_synonyms:
-            if not downloader.is_installed("wordnet"):
-                downloader.download("wordnet")
+        # Load shared WordNet database.
+        if self.use_synonyms or self.use_antonyms:
+            wordnet_corpus()
+
+        # Preprocessing depends on the stop words, so invalidate the cache.
+        self._clear_terms()
 
     def preprocess(self, text: str) -> Set[str]:
         """
         Compute terms for a text, expand synonyms, remove stopwords
         and apply stemming.
         """
+        return set(self.preprocess_terms(text))
+
+    def preprocess_terms(self, text: str) -> List[str]:
+        """
+        Compute terms for a text like `preprocess`,
+        but keep repeated terms, e.g., for counting term frequencies.
+        Expanded synonyms and antonyms are added once.
+        """
 
         # Get tokenized terms.
-        terms: Set[str] = set(word_tokenize(text))
+        if self.tokens is not None and text in self.tokens:
+            terms = self.tokens.terms(text)
+        else:
+            terms = get_tokenizer(self.tokenizer).tokenize(text)
 
         # Expand synonym and antonym terms.
         if self.use_synonyms or self.use_antonyms:
-            synonym_terms = set()
-            for term in terms:
-                synonym_terms.add(term)
-                for synonym_set in wordnet.synsets(term):
-                    for lemma in synonym_set.lemmas():
-                        if self.use_synonyms:
-                            synonym_terms.add(lemma.name())
-                        if self.use_antonyms and lemma.antonyms():
-                            for antonym in lemma.antonyms():
-                                synonym_terms.add(antonym.name())
+            tokens = set(terms)
+            terms = terms + sorted(self.expand(tokens) - tokens)
 
         # Remove stop words.
         if self.use_stop_words and self.stop_words is not None:
-            terms.difference_update(self.stop_words)
+            terms = [term for term in terms if term not in self.stop_words]
 
         # Transform terms to stems.
         if self.stemmer is not None:
-            terms = set(map(self.stemmer.stem, terms))
+            terms = list(map(self.stemmer.stem, terms))
 
         return terms
 
-    def term_overlap(self, arg: Argument, kp: KeyPoint) -> Label:
+    def expand(self, terms: Set[str]) -> Set[str]:
         """
-        Calculate term overlap between an argument and key point
-        based on overlapping terms, i.e., terms that occur in the argument's
-        and the key point's text.
+        Expand terms with their synonyms and/or antonyms.
+        Expansions are looked up in the precomputed expansion table
+        if loaded. Only terms missing from the table
+        are looked up in WordNet directly.
         """
+        expanded_terms: Set[str] = set(terms)
+        missing_terms: Set[str] = set(terms)
+        if self.expansion_table is not None:
+            expanded_terms = self.expansion_table.expand(terms)
+            missing_terms = {
+                term for term in terms
+                if term not in self.expansion_table
+            }
+        for term in missing_terms:
+            expanded_terms.update(wordnet_expansions(
+                term,
+                self.use_synonyms,
+                self.use_antonyms,
+            ))
+        return expanded_terms
 
-        # Extract terms from argument and key point.
-        arg_terms = self.preprocess(arg.text)
-        kp_terms = self.preprocess(kp.text)
+    def prepare_tokens(self, data: Dataset):
+        """
+        Tokenize all of the dataset's texts in parallel.
+        If enabled, also load precomputed synonym and antonym expansions
+        for the vocabulary of the dataset's texts.
+        Stop word removal and stemming are then applied only once
+        per token of the vocabulary, not per occurrence.
+        """
+        texts = [arg.text for arg in data.arguments_sorted]
+        texts.extend(kp.text for kp in data.key_points_sorted)
+        self.tokens = preprocess_texts(
+            texts,
+            language=self.language,
+            stemming=False,
+            tokenizer=self.tokenizer,
+            processes=self.processes,
+        )
+        if self.use_synonyms or self.use_antonyms:
+            self.expansion_table = load_expansion_table(
+                self.tokens.vocabulary.ids.keys(),
+                self.use_synonyms,
+                self.use_antonyms,
+            )
+        # Cached terms might have been expanded without the table,
+        # and term IDs refer to the previous vocabulary.
+        self._clear_terms()
+        self._token_term_id_array = array(
+            [
+                self._token_term_id(token)
+                for token in self.tokens.vocabulary.ids.keys()
+            ],
+            dtype=int64,
+        )
+
+    def _clear_terms(self):
+        self.terms.cache_clear()
+        self.term_ids.cache_clear()
+        self.term_vocabulary = TermVocabulary()
+        self._token_term_ids = {}
+        self._token_term_id_array = None
+
+    def _token_term_id(self, token: str) -> int:
+        """
+        Look up the preprocessed term ID of a single token,
+        i.e., -1 if the token is a stop word and the ID of its stem
+        if stemming is enabled.
+        """
+        term_id = self._token_term_ids.get(token)
+        if term_id is None:
+            if self.use_stop_words and self.stop_words is not None and \
+                    token in self.stop_words:
+                term_id = -1
+            else:
+                term = token
+                if self.stemmer is not None:
+                    term = self.stemmer.stem(term)
+                term_id = self.term_vocabulary.encode((term,))[0]
+            self._token_term_ids[token] = term_id
+        return term_id
+
+    def _terms(self, text: str) -> FrozenSet[str]:
+        return frozenset(self.preprocess_terms(text))
+
+    def _term_ids(self, text: str) -> Tuple[int, ...]:
+        if self._token_term_id_array is None or text not in self.tokens:
+            return tuple(
+                self.term_vocabulary.encode(self.preprocess_terms(text))
+            )
+        # Map the text's token IDs to preprocessed term IDs.
+        term_ids = self._token_term_id_array[self.tokens.term_ids[text]]
+        if self.use_synonyms or self.use_antonyms:
+            tokens = set(self.tokens.terms(text))
+            expansion_term_ids = array(
+                [
+                    self._token_term_id(term)
+                    for term in sorted(self.expand(tokens) - tokens)
+                ],
+                dtype=int64,
+            )
+            term_ids = concatenate((term_ids, expansion_term_ids))
+        return tuple(term_ids[term_ids >= 0].tolist())
+
+    @staticmethod
+    def overlap_coefficient(
+            arg_terms: FrozenSet[str],
+            kp_terms: FrozenSet[str],
+    ) -> Label:
+        """
+        Calculate the overlap coefficient of preprocessed argument
+        and key point terms.
+        """
 
         # Calculate number of terms that exist in both.
         max_overlap_count = min(len(arg_terms), len(kp_terms))
@@ -162,10 +350,125 @@ class TermOverlapMatcher(UntrainedMatcher):
         relative_overlap = overlap_count / max_overlap_count
         return relative_overlap
 
+    def term_overlap(self, arg: Argument, kp: KeyPoint) -> Label:
+        """
+        Calculate term overlap between an argument and key point
+        based on overlapping terms, i.e., terms that occur in the argument's
+        and the key point's text.
+        Terms are preprocessed once per unique text and then cached.
+        """
+
+        # Extract terms from argument and key point.
+        arg_terms = self.terms(arg.text)
+        kp_terms = self.terms(kp.text)
+
+        return TermOverlapMatcher.overlap_coefficient(arg_terms, kp_terms)
+
     def predict(self, data: Dataset) -> Labels:
-        return {
-            (arg.id, kp.id): self.term_overlap(arg, kp)
-            for arg in data.arguments
-            for kp in data.key_points
-            if arg.topic == kp.topic and arg.stance == kp.stance
-        }
+        self.prepare_tokens(data)
+        if self.weighting != TermWeighting.none:
+            return self.predict_weighted(data)
+
+        labels: Labels = {}
+        for args, kps in data.groups.values():
+            # Encode the group's term sets over the shared vocabulary
+            # and compute all overlaps at once.
+            arg_term_ids = [self.term_ids(arg.text) for arg in args]
+            kp_term_ids = [self.term_ids(kp.text) for kp in kps]
+            terms_count = len(self.term_vocabulary)
+            arg_matrix = term_matrix(arg_term_ids, terms_count)
+            kp_matrix = term_matrix(kp_term_ids, terms_count)
+
+            if self.sparse:
+                # Score only candidates found in the inverted index.
+                index = TermIndex(kp_matrix)
+                overlaps = index.overlap_coefficients(arg_matrix)
+                for i, j, overlap in zip(
+                        overlaps.row, overlaps.col, overlaps.data
+                ):
+                    labels[args[i].id, kps[j].id] = float(overlap)
+            else:
+                overlaps = overlap_coefficients(arg_matrix, kp_matrix)
+                for i, arg in enumerate(args):
+                    for j, kp in enumerate(kps):
+                        labels[arg.id, kp.id] = float(overlaps[i, j])
+        return labels
+
+    def predict_weighted(self, data: Dataset) -> Labels:
+        """
+        Score pairs by TF-IDF cosine similarity or BM25.
+        Inverse document frequencies are computed per topic,
+        with all arguments and key points of the topic as documents.
+        BM25 scores are divided by the maximum score of each topic and
+        stance group, such that predicted labels are between 0 and 1.
+        """
+        topic_groups: Dict[
+            Topic,
+            List[Tuple[List[Argument], List[KeyPoint]]]
+        ] = {}
+        for (topic, _), group in data.groups.items():
+            topic_groups.setdefault(topic, []).append(group)
+
+        labels: Labels = {}
+        for groups in topic_groups.values():
+            # Encode term frequencies over the shared vocabulary.
+            group_term_ids = [
+                (
+                    [self.term_ids(arg.text) for arg in args],
+                    [self.term_ids(kp.text) for kp in kps],
+                )
+                for args, kps in groups
+            ]
+            terms_count = len(self.term_vocabulary)
+            group_matrices = [
+                (
+                    term_matrix(arg_ids, terms_count, binary=False),
+                    term_matrix(kp_ids, terms_count, binary=False),
+                )
+                for arg_ids, kp_ids in group_term_ids
+            ]
+            documents = term_matrix(
+                [
+                    ids
+                    for arg_ids, kp_ids in group_term_ids
+                    for ids in arg_ids + kp_ids
+                ],
+                terms_count,
+            )
+            idf = inverse_document_frequencies(documents, self.weighting)
+            arg_lengths = [
+                len(ids)
+                for arg_ids, _ in group_term_ids
+                for ids in arg_ids
+            ]
+            average_length = sum(arg_lengths) / max(1, len(arg_lengths))
+
+            for (args, kps), (arg_counts, kp_counts) in zip(
+                    groups, group_matrices
+            ):
+                if self.weighting == TermWeighting.bm25:
+                    scores = bm25_scores(
+                        arg_counts, kp_counts, idf, average_length,
+                        k1=self.bm25_k1, b=self.bm25_b,
+                    )
+                    max_score = scores.max() if scores.nnz > 0 else 0
+                    if max_score > 0:
+                        scores = scores / max_score
+                else:
+                    scores = tfidf_cosine_similarities(
+                        arg_counts, kp_counts, idf
+                    )
+                # Clip rounding errors of normalized scores.
+                scores = scores.minimum(1).tocoo()
+
+                if self.sparse:
+                    for i, j, score in zip(
+                            scores.row, scores.col, scores.data
+                    ):
+                        labels[args[i].id, kps[j].id] = float(score)
+                else:
+                    dense_scores = scores.toarray()
+                    for i, arg in enumerate(args):
+                        for j, kp in enumerate(kps):
+                            labels[arg.id, kp.id] = float(dense_scores[i, j])
+        return labels
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from pytest import raises
+
+from modern_talking.matchers import UntrainedMatcher
+from modern_talking.matchers.combine import RetrieveRerank
+from modern_talking.model import Dataset, Labels, LabelledDataset, \
+    Argument, KeyPoint
+
+
+class _ConstantMatcher(UntrainedMatcher):
+    """
+    Label all pairs of the same topic and stance with the same score.
+    """
+
+    score: float
+
+    def __init__(self, score: float):
+        self.score = score
+
+    @property
+    def slug(self) -> str:
+        return f"constant-{self.score}"
+
+    def predict(self, data: Dataset) -> Labels:
+        return {
+            (arg.id, kp.id): self.score
+            for args, kps in data.groups.values()
+            for arg in args
+            for kp in kps
+        }
+
+
+def _dataset() -> LabelledDataset:
+    arguments = {
+        Argument(f"arg{i}", f"Argument {i}.", "topic", 1)
+        for i in range(3)
+    }
+    key_points = {
+        KeyPoint(f"kp{i}", f"Key point {i}.", "topic", 1)
+        for i in range(2)
+    }
+    labels = {
+        (arg.id, kp.id): float(arg.id[-1] == kp.id[-1])
+        for arg in arguments
+        for kp in key_points
+    }
+    return LabelledDataset(arguments, key_points, labels)
+
+
+def test_retrieve_rerank_predict_before_calibration():
+    matcher = RetrieveRerank(_ConstantMatcher(0.5), _ConstantMatcher(1))
+
+    with raises(RuntimeError):
+        matcher.predict(_dataset())
+
+
+def test_retrieve_rerank_predict_after_training(tmp_path: Path):
+    matcher = RetrieveRerank(_ConstantMatcher(0.5), _ConstantMatcher(1))
+    data = _dataset()
+
+    matcher.train(data, data, tmp_path)
+    labels = matcher.predict(data)
+
+    assert matcher.candidates is not None
+    assert len(labels) == len(data.arguments) * matcher.candidates
+    assert set(labels.values()) == {1}
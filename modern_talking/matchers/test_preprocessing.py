@@ -0,0 +1,75 @@
+from pathlib import Path
+
+from pytest import MonkeyPatch, importorskip
+
+from modern_talking.matchers import preprocessing
+from modern_talking.matchers.preprocessing import preprocess_texts
+from modern_talking.matchers.tokenization import TokenizerType
+from modern_talking.model import Argument, KeyPoint, LabelledDataset
+
+
+def _forbid_process_pools(monkeypatch: MonkeyPatch):
+    def process_pool_executor(*args, **kwargs):
+        raise AssertionError("Process pool started.")
+
+    monkeypatch.setattr(
+        preprocessing,
+        "ProcessPoolExecutor",
+        process_pool_executor,
+    )
+    # Pretend to have multiple CPUs, such that pools would be started.
+    monkeypatch.setattr(preprocessing, "cpu_count", lambda: 4)
+
+
+def test_preprocess_texts_single_process(monkeypatch: MonkeyPatch):
+    _forbid_process_pools(monkeypatch)
+    texts = [f"Text number {i}." for i in range(10)]
+
+    preprocessed = preprocess_texts(
+        texts,
+        stemming=False,
+        tokenizer=TokenizerType.regex,
+        processes=1,
+        chunk_size=2,
+    )
+
+    assert preprocessed.terms("Text number 3.") == ["Text", "number", "3", "."]
+
+
+def test_streaming_regression_single_process(
+        monkeypatch: MonkeyPatch,
+        tmp_path: Path,
+):
+    # The regression matchers module depends on spaCy and Simple Transformers.
+    importorskip("spacy")
+    importorskip("simpletransformers")
+    from modern_talking.matchers.regression import \
+        StreamingRegressionMatcher
+
+    _forbid_process_pools(monkeypatch)
+    # More unique texts per chunk than fit in one preprocessing chunk.
+    arguments = {
+        Argument(f"arg{i}", f"Argument {i} about uniforms.", "topic", 1)
+        for i in range(600)
+    }
+    key_points = {
+        KeyPoint(f"kp{i}", f"Key point {i} about costs.", "topic", 1)
+        for i in range(2)
+    }
+    labels = {
+        (arg.id, kp.id): float(arg.id[-1] == kp.id[-1])
+        for arg in arguments
+        for kp in key_points
+    }
+    data = LabelledDataset(arguments, key_points, labels)
+    matcher = StreamingRegressionMatcher(
+        features_count=2 ** 10,
+        chunk_size=1200,
+        tokenizer=TokenizerType.regex,
+        processes=1,
+    )
+
+    matcher.train(data, data, tmp_path)
+    predicted_labels = matcher.predict(data)
+
+    assert predicted_labels.keys() == labels.keys()
@@ -0,0 +1,167 @@
+from typing import List, Tuple, Dict
+
+from pytest import skip, mark
+
+from modern_talking.matchers.tokenization import NltkTokenizer, \
+    RegexTokenizer, Tokenizer, tokenizer_parity
+from modern_talking.model import DatasetType
+from modern_talking.pipeline import Pipeline, data_dir
+
+# Minimum token F1 score of the regex tokenizer with respect to
+# NLTK's word tokenizer on the shared task texts.
+_MIN_TOKEN_F1_SCORE = 0.95
+
+# Sentences with their tokens from NLTK's word tokenizer,
+# covering contractions, quotes, hyphens, and numbers.
+_NLTK_TOKENS: List[Tuple[str, List[str]]] = [
+    (
+        "School uniforms are expensive and don't improve discipline.",
+        [
+            "School", "uniforms", "are", "expensive", "and", "do", "n't",
+            "improve", "discipline", ".",
+        ],
+    ),
+    (
+        "We can't ban something that people won't stop doing anyway.",
+        [
+            "We", "ca", "n't", "ban", "something", "that", "people", "wo",
+            "n't", "stop", "doing", "anyway", ".",
+        ],
+    ),
+    (
+        "It's the parents' responsibility, not the state's.",
+        [
+            "It", "'s", "the", "parents", "'", "responsibility", ",", "not",
+            "the", "state", "'s", ".",
+        ],
+    ),
+    (
+        "I'd say they'll regret it, and we've seen that before.",
+        [
+            "I", "'d", "say", "they", "'ll", "regret", "it", ",", "and", "we",
+            "'ve", "seen", "that", "before", ".",
+        ],
+    ),
+    (
+        "Homeschooling isn't good for kids; they need friends...",
+        [
+            "Homeschooling", "is", "n't", "good", "for", "kids", ";", "they",
+            "need", "friends", "...",
+        ],
+    ),
+    (
+        'The "right to die" is a basic human right.',
+        [
+            "The", "``", "right", "to", "die", "''", "is", "a", "basic",
+            "human", "right", ".",
+        ],
+    ),
+    (
+        'He said "no."',
+        [
+            "He", "said", "``", "no", ".", "''",
+        ],
+    ),
+    (
+        "Cannabis is a so-called gateway drug for 12-year-old children.",
+        [
+            "Cannabis", "is", "a", "so-called", "gateway", "drug", "for",
+            "12-year-old", "children", ".",
+        ],
+    ),
+    (
+        "Over 1,000 died, i.e. 3.5% of cases in the U.S. last year.",
+        [
+            "Over", "1,000", "died", ",", "i.e.", "3.5", "%", "of", "cases",
+            "in", "the", "U.S.", "last", "year", ".",
+        ],
+    ),
+    (
+        "The cost is $50 per student (or more) every month!",
+        [
+            "The", "cost", "is", "$", "50", "per", "student", "(", "or",
+            "more", ")", "every", "month", "!",
+        ],
+    ),
+    (
+        "Social media spread fake news: they can't verify it all.",
+        [
+            "Social", "media", "spread", "fake", "news", ":", "they", "ca",
+            "n't", "verify", "it", "all", ".",
+        ],
+    ),
+    (
+        "Should we subsidize journalism?",
+        [
+            "Should", "we", "subsidize", "journalism", "?",
+        ],
+    ),
+]
+
+
+class _FixtureTokenizer(Tokenizer):
+    """
+    Look up NLTK's tokens of the fixture sentences,
+    such that no NLTK models must be downloaded.
+    """
+
+    tokens: Dict[str, List[str]] = dict(_NLTK_TOKENS)
+
+    def tokenize(self, text: str) -> List[str]:
+        return self.tokens[text]
+
+
+@mark.parametrize("text,expected", _NLTK_TOKENS)
+def test_regex_tokenizer_edge_cases(text: str, expected: List[str]):
+    assert RegexTokenizer().tokenize(text) == expected
+
+
+def test_regex_tokenizer_fixture_parity():
+    parity = tokenizer_parity(
+        _FixtureTokenizer.tokens.keys(),
+        RegexTokenizer(),
+        reference=_FixtureTokenizer(),
+    )
+
+    assert parity.texts == len(_NLTK_TOKENS)
+    assert parity.identical_rate == 1
+    assert parity.token_f1_score == 1
+
+
+@mark.parametrize("text,expected", _NLTK_TOKENS)
+def test_nltk_tokenizer_fixture(text: str, expected: List[str]):
+    # Check that the fixture is up-to-date, if NLTK's models are installed.
+    try:
+        tokens = NltkTokenizer().tokenize(text)
+    except LookupError:
+        skip("NLTK Punkt models not installed.")
+    assert tokens == expected
+
+
+def _load_texts() -> List[str]:
+    texts: List[str] = []
+    for dataset_type in DatasetType:
+        suffix = dataset_type.name.lower()
+        if not (data_dir / f"arguments_{suffix}.csv").exists() or \
+                not (data_dir / f"key_points_{suffix}.csv").exists():
+            continue
+        data = Pipeline.load_dataset(dataset_type)
+        texts.extend(arg.text for arg in data.arguments_sorted)
+        texts.extend(kp.text for kp in data.key_points_sorted)
+    return texts
+
+
+def test_regex_tokenizer_dataset_parity():
+    # Optional check on the full shared task data, if available.
+    try:
+        NltkTokenizer().tokenize("Punkt is installed.")
+    except LookupError:
+        skip("NLTK Punkt models not installed.")
+    texts = _load_texts()
+    if len(texts) == 0:
+        skip("Shared task data not downloaded.")
+
+    parity = tokenizer_parity(texts, RegexTokenizer())
+
+    assert parity.texts > 0
+    assert parity.token_f1_score >= _MIN_TOKEN_F1_SCORE
@@ -0,0 +1,181 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from re import compile as compile_pattern, VERBOSE, IGNORECASE
+from typing import Iterable, List
+
+from nltk.tokenize import word_tokenize
+
+from modern_talking.model import DatasetType
+
+
+class Tokenizer(ABC):
+    """
+    Split texts into word tokens.
+    """
+
+    @abstractmethod
+    def tokenize(self, text: str) -> List[str]:
+        pass
+
+
+class NltkTokenizer(Tokenizer):
+    """
+    NLTK's default word tokenizer, i.e., Punkt sentence splitting
+    followed by the Penn Treebank word tokenizer.
+    """
+
+    def tokenize(self, text: str) -> List[str]:
+        return word_tokenize(text)
+
+
+# Approximation of the Penn Treebank conventions with a single regex:
+# split negations and clitics from words, keep abbreviations, numbers,
+# and hyphenated words together, and split off all other punctuation.
+_TOKEN_PATTERN = compile_pattern(
+    r"""
+    \w+(?=n't\b)
+    | n't\b
+    | '(?:s|m|d|ll|re|ve)\b
+    | (?:[a-z]\.){2,}
+    | \d+(?:[.,]\d+)+
+    | \w+(?:-\w+)*
+    | \.\.\.
+    | [^\w\s]
+    """,
+    VERBOSE | IGNORECASE,
+)
+
+# Characters after which a double quote opens a quotation,
+# like in the Penn Treebank tokenizer.
+_OPENING_QUOTE_PREFIXES = frozenset(" \t\n([{<")
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    Fast tokenizer based on a single precompiled regular expression,
+    approximating the output of NLTK's word tokenizer.
+    """
+
+    def tokenize(self, text: str) -> List[str]:
+        if '"' not in text:
+            return _TOKEN_PATTERN.findall(text)
+        # Convert double quotes to opening (``) and closing ('') quotes.
+        tokens: List[str] = []
+        for match in _TOKEN_PATTERN.finditer(text):
+            token = match.group()
+            if token == '"':
+                start = match.start()
+                if start == 0 or text[start - 1] in _OPENING_QUOTE_PREFIXES:
+                    token = "``"
+                else:
+                    token = "''"
+            tokens.append(token)
+        return tokens
+
+
+class TokenizerType(str, Enum):
+    nltk = "nltk"
+    regex = "regex"
+
+    def __str__(self):
+        # pylint: disable=invalid-str-returned
+        return self.value
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(tokenizer_type: TokenizerType) -> Tokenizer:
+    """
+    Shared tokenizer instance of the given type.
+    """
+    if tokenizer_type == TokenizerType.regex:
+        return RegexTokenizer()
+    else:
+        return NltkTokenizer()
+
+
+@dataclass(frozen=True)
+class TokenizerParity:
+    """
+    Agreement of a tokenizer with NLTK's word tokenizer.
+    The token F1 score is computed from the bags of tokens of each text.
+    """
+    texts: int
+    identical_texts: int
+    token_precision: float
+    token_recall: float
+
+    @property
+    def identical_rate(self) -> float:
+        return self.identical_texts / self.texts if self.texts > 0 else 1
+
+    @property
+    def token_f1_score(self) -> float:
+        precision_recall = self.token_precision + self.token_recall
+        if precision_recall == 0:
+            return 0
+        return 2 * self.token_precision * self.token_recall / \
+            precision_recall
+
+
+def tokenizer_parity(
+        texts: Iterable[str],
+        tokenizer: Tokenizer,
+        reference: Tokenizer = NltkTokenizer(),
+) -> TokenizerParity:
+    """
+    Measure how closely a tokenizer's output matches
+    the reference tokenizer's output on the given texts.
+    """
+    texts_count = 0
+    identical = 0
+    common_tokens = 0
+    predicted_tokens = 0
+    reference_tokens = 0
+    for text in dict.fromkeys(texts):
+        tokens = tokenizer.tokenize(text)
+        expected = reference.tokenize(text)
+        texts_count += 1
+        if tokens == expected:
+            identical += 1
+        common_tokens += sum((Counter(tokens) & Counter(expected)).values())
+        predicted_tokens += len(tokens)
+        reference_tokens += len(expected)
+    return TokenizerParity(
+        texts=texts_count,
+        identical_texts=identical,
+        token_precision=common_tokens / predicted_tokens
+        if predicted_tokens > 0 else 1,
+        token_recall=common_tokens / reference_tokens
+        if reference_tokens > 0 else 1,
+    )
+
+
+def print_tokenizer_parity() -> None:
+    """
+    Print the parity of all tokenizers with NLTK's word tokenizer
+    on the arguments and key points of the shared task datasets.
+    """
+    # Import here to avoid circular import.
+    from modern_talking.data import download_kpa_2021_data
+    from modern_talking.matchers.resources import require_tokenizer
+    from modern_talking.pipeline import Pipeline
+
+    download_kpa_2021_data()
+    require_tokenizer()
+    texts: List[str] = []
+    for dataset_type in DatasetType:
+        data = Pipeline.load_dataset(dataset_type)
+        texts.extend(arg.text for arg in data.arguments_sorted)
+        texts.extend(kp.text for kp in data.key_points_sorted)
+    for tokenizer_type in TokenizerType:
+        parity = tokenizer_parity(texts, get_tokenizer(tokenizer_type))
+        print(f"Tokenizer '{tokenizer_type}': "
+              f"{parity.identical_rate:.1%} of {parity.texts} texts "
+              f"identical, token F1 score {parity.token_f1_score:.3f}")
+
+
+if __name__ == "__main__":
+    print_tokenizer_parity()
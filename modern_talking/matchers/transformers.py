@@ -1,16 +1,16 @@
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Sequence
 
 from imblearn.over_sampling import RandomOverSampler
 from nlpaug.augmenter.word import SynonymAug, AntonymAug, RandomWordAug
 from nlpaug.flow import Sometimes, Pipeline
-from nltk.downloader import Downloader
 from pandas import DataFrame
 from simpletransformers.classification import ClassificationModel
 from simpletransformers.config.model_args import ClassificationArgs
 from torch.cuda import is_available as is_cuda_available
 
 from modern_talking.matchers import Matcher, LabelPolicy
+from modern_talking.matchers.resources import require_augmenter
 from modern_talking.matchers.utils import describe_model_configuration
 from modern_talking.model import Dataset, Labels, LabelledDataset, \
     ArgumentKeyPointPair
@@ -159,13 +159,7 @@ class TransformersMatcher(Matcher):
 
         # Download dependencies for augmenter.
         if self.augment > 0:
-            downloader = Downloader()
-            if not downloader.is_installed("punkt"):
-                downloader.download("punkt")
-            if not downloader.is_installed("wordnet"):
-                downloader.download("wordnet")
-            if not downloader.is_installed("averaged_perceptron_tagger"):
-                downloader.download("averaged_perceptron_tagger")
+            require_augmenter()
 
     def train(
             self,
@@ -199,6 +193,24 @@ class TransformersMatcher(Matcher):
             for (arg, kp), label in zip(pairs, predictions)
         }
 
+    def predict_pairs(
+            self,
+            data: Dataset,
+            pairs: Sequence[ArgumentKeyPointPair],
+    ) -> Labels:
+        if len(pairs) == 0:
+            return {}
+
+        # Predict labels of the candidate pairs only.
+        texts = [[arg.text, kp.text] for arg, kp in pairs]
+        predictions, _ = self.model.predict(texts)
+
+        # Return predictions.
+        return {
+            (arg.id, kp.id): float(label)
+            for (arg, kp), label in zip(pairs, predictions)
+        }
+
     def load_model(self, path: Path) -> bool:
         model_path = path / "model"
         if not model_path.exists() or not model_path.is_dir():
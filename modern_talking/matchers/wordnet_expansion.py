@@ -0,0 +1,155 @@
+from hashlib import sha256
+from json import dump, load
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from numpy import ndarray, array, int32, int64, cumsum, zeros, save, \
+    load as load_array
+
+from modern_talking.matchers.resources import wordnet_corpus
+
+data_dir = Path(__file__).parent.parent.parent / "data"
+expansions_dir = data_dir / "cache" / "wordnet"
+
+
+def wordnet_expansions(
+        term: str,
+        synonyms: bool,
+        antonyms: bool,
+) -> Set[str]:
+    """
+    Look up WordNet synonyms and/or antonyms of a term.
+    """
+    expanded_terms: Set[str] = set()
+    for synonym_set in wordnet_corpus().synsets(term):
+        for lemma in synonym_set.lemmas():
+            if synonyms:
+                expanded_terms.add(lemma.name())
+            if antonyms and lemma.antonyms():
+                for antonym in lemma.antonyms():
+                    expanded_terms.add(antonym.name())
+    expanded_terms.discard(term)
+    return expanded_terms
+
+
+class ExpansionTable:
+    """
+    Compact table of precomputed WordNet expansions of a vocabulary.
+    The expanded term IDs of the vocabulary's i-th term are stored in
+    `expansions[offsets[i]:offsets[i + 1]]`.
+    When loaded from disk, the arrays are memory-mapped.
+    """
+
+    terms: List[str]
+    term_ids: Dict[str, int]
+    vocabulary_size: int
+    offsets: ndarray
+    expansions: ndarray
+
+    def __init__(
+            self,
+            terms: List[str],
+            vocabulary_size: int,
+            offsets: ndarray,
+            expansions: ndarray,
+    ):
+        self.terms = terms
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self.vocabulary_size = vocabulary_size
+        self.offsets = offsets
+        self.expansions = expansions
+
+    def __contains__(self, term: str) -> bool:
+        term_id = self.term_ids.get(term)
+        return term_id is not None and term_id < self.vocabulary_size
+
+    def expand(self, terms: Iterable[str]) -> Set[str]:
+        """
+        Add the expansions of all terms from the table's vocabulary.
+        """
+        expanded_terms = set(terms)
+        for term in list(expanded_terms):
+            term_id = self.term_ids.get(term)
+            if term_id is None or term_id >= self.vocabulary_size:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            expanded_terms.update(
+                self.terms[expanded_id]
+                for expanded_id in self.expansions[start:end].tolist()
+            )
+        return expanded_terms
+
+    @staticmethod
+    def build(
+            vocabulary: Iterable[str],
+            synonyms: bool,
+            antonyms: bool,
+    ) -> "ExpansionTable":
+        """
+        Precompute WordNet expansions for each term of the vocabulary.
+        """
+        terms: List[str] = sorted(set(vocabulary))
+        vocabulary_size = len(terms)
+        term_ids: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+        expanded_ids: List[List[int]] = []
+        for term in terms[:vocabulary_size]:
+            ids: List[int] = []
+            for expanded_term in sorted(
+                    wordnet_expansions(term, synonyms, antonyms)
+            ):
+                if expanded_term not in term_ids:
+                    term_ids[expanded_term] = len(terms)
+                    terms.append(expanded_term)
+                ids.append(term_ids[expanded_term])
+            expanded_ids.append(ids)
+        offsets = zeros(vocabulary_size + 1, dtype=int64)
+        offsets[1:] = cumsum([len(ids) for ids in expanded_ids])
+        expansions = array(
+            [i for ids in expanded_ids for i in ids],
+            dtype=int32,
+        )
+        return ExpansionTable(terms, vocabulary_size, offsets, expansions)
+
+    def save(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+        with (path / "terms.json").open("w") as file:
+            dump({
+                "vocabulary_size": self.vocabulary_size,
+                "terms": self.terms,
+            }, file)
+        save(path / "offsets.npy", self.offsets)
+        save(path / "expansions.npy", self.expansions)
+
+    @staticmethod
+    def load(path: Path) -> "ExpansionTable":
+        with (path / "terms.json").open("r") as file:
+            json = load(file)
+        return ExpansionTable(
+            terms=json["terms"],
+            vocabulary_size=json["vocabulary_size"],
+            offsets=load_array(path / "offsets.npy", mmap_mode="r"),
+            expansions=load_array(path / "expansions.npy", mmap_mode="r"),
+        )
+
+
+def load_expansion_table(
+        vocabulary: Iterable[str],
+        synonyms: bool,
+        antonyms: bool,
+) -> ExpansionTable:
+    """
+    Load the precomputed expansion table for a vocabulary from the cache
+    directory, or build and save it if it doesn't exist yet.
+    """
+    terms = sorted(set(vocabulary))
+    vocabulary_hash = sha256("\n".join(terms).encode()).hexdigest()
+    synonyms_suffix = "-synonyms" if synonyms else ""
+    antonyms_suffix = "-antonyms" if antonyms else ""
+    path = expansions_dir / \
+        f"{vocabulary_hash[:16]}{synonyms_suffix}{antonyms_suffix}"
+    if (path / "expansions.npy").exists():
+        return ExpansionTable.load(path)
+    print(f"Precompute WordNet expansions for {len(terms)} terms.")
+    table = ExpansionTable.build(terms, synonyms, antonyms)
+    table.save(path)
+    return table
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
+from functools import cached_property
 from enum import Enum, auto, unique
-from typing import Literal, Tuple, Dict, Set
+from typing import Literal, Tuple, Dict, Set, List
 
 # Type alias for argument ID.
 ArgumentId = str
@@ -78,6 +79,42 @@ class Dataset:
     def key_points_sorted(self):
         return sorted(self.key_points, key=lambda kp: kp.id)
 
+    @cached_property
+    def arguments_by_id(self) -> Dict[ArgumentId, Argument]:
+        """
+        Index of arguments by their ID, built once per dataset.
+        """
+        return {arg.id: arg for arg in self.arguments}
+
+    @cached_property
+    def key_points_by_id(self) -> Dict[KeyPointId, KeyPoint]:
+        """
+        Index of key points by their ID, built once per dataset.
+        """
+        return {kp.id: kp for kp in self.key_points}
+
+    @property
+    def groups(self) -> Dict[
+        Tuple[Topic, Stance],
+        Tuple[List[Argument], List[KeyPoint]]
+    ]:
+        """
+        Arguments and key points grouped by topic and stance,
+        each sorted by ID.
+        Only groups with at least one argument and one key point
+        are included, as only these contain candidate pairs.
+        """
+        arguments: Dict[Tuple[Topic, Stance], List[Argument]] = {}
+        for arg in self.arguments_sorted:
+            arguments.setdefault((arg.topic, arg.stance), []).append(arg)
+        key_points: Dict[Tuple[Topic, Stance], List[KeyPoint]] = {}
+        for kp in self.key_points_sorted:
+            key_points.setdefault((kp.topic, kp.stance), []).append(kp)
+        return {
+            group: (arguments[group], key_points[group])
+            for group in sorted(arguments.keys() & key_points.keys())
+        }
+
 
 @dataclass(frozen=True)
 class LabelledDataset(Dataset):
@@ -1,11 +1,15 @@
-from csv import DictReader
+from csv import DictReader, DictWriter
+from dataclasses import asdict, fields
 from json import load, dump
 from math import isnan
 from pathlib import Path
-from typing import Set, Optional
+from typing import Set, Optional, Dict, List, Iterator
 from zipfile import ZipFile
 
 from modern_talking.evaluation import Metric, EvaluationMode
+from modern_talking.evaluation.map import GroupScore, evaluate_groups
+from modern_talking.evaluation.threshold import ThresholdPoint, \
+    precision_recall_curve
 from modern_talking.matchers import Matcher
 from modern_talking.model import Argument, KeyPoint, Labels, LabelledDataset, \
     DatasetType, Dataset
@@ -107,6 +111,27 @@ class Pipeline:
                 for row in csv
             }
 
+    @staticmethod
+    def load_labels_chunks(path: Path, chunk_size: int) -> Iterator[Labels]:
+        """
+        Stream argument key point match labels from a CSV file in chunks,
+        without loading all labels into memory.
+        :param path: Path to the CSV file.
+        :param chunk_size: Maximum number of labels per chunk.
+        :return: An iterator of dictionaries of match labels
+        for argument and key point IDs from the file.
+        """
+        with path.open("r") as file:
+            csv = DictReader(file)
+            chunk: Labels = {}
+            for row in csv:
+                chunk[row["arg_id"], row["key_point_id"]] = float(row["label"])
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = {}
+            if len(chunk) > 0:
+                yield chunk
+
     @staticmethod
     def load_predictions(path: Path) -> Labels:
         """
@@ -244,6 +269,63 @@ class Pipeline:
         with path.open("w") as file:
             file.write(summary)
 
+    @staticmethod
+    def save_threshold_curves(
+            path: Path,
+            curves: Dict[str, Dict[EvaluationMode, List[ThresholdPoint]]],
+    ):
+        """
+        Save precision, recall, and F1 score for every distinct threshold
+        to a CSV file.
+        :param path: Path to the CSV file.
+        :param curves: Threshold curves by dataset name and evaluation mode.
+        """
+        with path.open("w") as file:
+            csv = DictWriter(file, fieldnames=[
+                "dataset", "mode", "threshold",
+                "precision", "recall", "f1_score",
+            ])
+            csv.writeheader()
+            for dataset_name, mode_curves in curves.items():
+                for mode, curve in mode_curves.items():
+                    for point in curve:
+                        csv.writerow({
+                            "dataset": dataset_name,
+                            "mode": mode.name,
+                            "threshold": point.threshold,
+                            "precision": point.precision,
+                            "recall": point.recall,
+                            "f1_score": point.f1_score,
+                        })
+
+    @staticmethod
+    def save_group_scores(
+            csv_path: Path,
+            json_path: Path,
+            group_scores: Dict[str, List[GroupScore]],
+    ):
+        """
+        Save per-topic and per-stance evaluation scores
+        to a CSV file and a JSON file.
+        :param csv_path: Path to the CSV file.
+        :param json_path: Path to the JSON file.
+        :param group_scores: Group scores by dataset name.
+        """
+        rows = [
+            {"dataset": dataset_name, **asdict(score)}
+            for dataset_name, scores in group_scores.items()
+            for score in scores
+        ]
+        with csv_path.open("w") as file:
+            csv = DictWriter(file, fieldnames=[
+                "dataset",
+                *(field.name for field in fields(GroupScore)),
+            ])
+            csv.writeheader()
+            csv.writerows(rows)
+        with json_path.open("w") as file:
+            dump(rows, file)
+
     def train_evaluate(self, ignore_test: bool = False) -> float:
         """
         Parse training, test, and development data, train the matcher,
@@ -413,6 +495,32 @@ class Pipeline:
             metric_name=self.metric.slug
         )
 
+        # Save precision-recall curves for all thresholds.
+        curve_file = output_dir / f"curve-{self.matcher.slug}.csv"
+        Pipeline.save_threshold_curves(curve_file, {
+            name: {
+                mode: precision_recall_curve(labels, data.labels, mode)
+                for mode in EvaluationMode
+            }
+            for name, labels, data in [
+                ("train", train_labels, train_data),
+                ("dev", dev_labels, dev_data),
+                ("test", test_labels, test_data),
+            ]
+        })
+
+        # Save per-topic and per-stance scores.
+        breakdown_file = output_dir / f"breakdown-{self.matcher.slug}.csv"
+        Pipeline.save_group_scores(
+            breakdown_file,
+            breakdown_file.with_suffix(".json"),
+            {
+                "train": evaluate_groups(train_labels, train_data.labels),
+                "dev": evaluate_groups(dev_labels, dev_data.labels),
+                "test": evaluate_groups(test_labels, test_data.labels),
+            }
+        )
+
         return test_result_average
 
     def evaluate(self, ignore_test: bool = False) -> float:
@@ -4,21 +4,27 @@ from typing import Iterable
 from modern_talking.evaluation import Metric
 from modern_talking.evaluation.f_measure import MacroF1Score, F1Score
 from modern_talking.evaluation.manual_errors import ManualErrors
-from modern_talking.evaluation.map import MeanAveragePrecision
+from modern_talking.evaluation.map import MeanAveragePrecision, \
+    IncrementalMeanAveragePrecision
 from modern_talking.evaluation.precision import MacroPrecision, Precision
 from modern_talking.evaluation.recall import MacroRecall, Recall
+from modern_talking.evaluation.threshold import BestF1Score
 from modern_talking.matchers import LabelPolicy, Matcher
+from modern_talking.matchers.term_index import TermWeighting
+from modern_talking.matchers.tokenization import TokenizerType
 from modern_talking.pipeline import Pipeline
 
 _metrics: Iterable[Metric] = [
     MeanAveragePrecision(),
     MeanAveragePrecision(new=True),
+    IncrementalMeanAveragePrecision(),
     Precision(),
     MacroPrecision(),
     Recall(),
     MacroRecall(),
     F1Score(),
     MacroF1Score(),
+    BestF1Score(),
     ManualErrors(),
 ]
 
@@ -49,6 +55,9 @@ def _prepare_parser(parser: ArgumentParser) -> None:
     transformers_parser = matcher_parsers.add_parser("transformers")
     _prepare_transformers_parser(transformers_parser)
 
+    bi_encoder_parser = matcher_parsers.add_parser("bi-encoder")
+    _prepare_bi_encoder_parser(bi_encoder_parser)
+
     parser.add_argument(
         "--test-unknown",
         dest="test_known",
@@ -111,6 +120,40 @@ def _prepare_term_overlap_parser(parser: ArgumentParser) -> None:
         type=str,
         default="english",
     )
+    parser.add_argument(
+        "--sparse",
+        dest="sparse",
+        action="store_true",
+        help="Only predict pairs that share at least one term."
+    )
+    parser.add_argument(
+        "--tokenizer",
+        dest="tokenizer",
+        type=TokenizerType,
+        choices=list(TokenizerType),
+        default=TokenizerType.nltk,
+        help="Use NLTK's word tokenizer or a faster regex tokenizer.",
+    )
+    parser.add_argument(
+        "--weighting",
+        dest="weighting",
+        type=TermWeighting,
+        choices=list(TermWeighting),
+        default=TermWeighting.none,
+        help="Weight terms by TF-IDF or BM25 with per-topic IDF.",
+    )
+    parser.add_argument(
+        "--bm25-k1",
+        dest="bm25_k1",
+        type=float,
+        default=1.2,
+    )
+    parser.add_argument(
+        "--bm25-b",
+        dest="bm25_b",
+        type=float,
+        default=0.75,
+    )
 
 
 def _prepare_bilstm_parser(parser: ArgumentParser) -> None:
@@ -299,6 +342,57 @@ def _prepare_transformers_parser(parser: ArgumentParser) -> None:
     )
 
 
+def _prepare_bi_encoder_parser(parser: ArgumentParser) -> None:
+    parser.add_argument(
+        "--model-name", "--name",
+        dest="model_name",
+        type=str,
+        default="distilbert-base-uncased",
+    )
+    parser.add_argument(
+        "--max-sequence-length", "--max-length",
+        dest="max_sequence_length",
+        type=int,
+        default=128,
+    )
+    parser.add_argument(
+        "--batch-size", "--batch",
+        dest="batch_size",
+        type=int,
+        default=16,
+    )
+    parser.add_argument(
+        "--epochs",
+        dest="epochs",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--learning-rate",
+        dest="learning_rate",
+        type=float,
+        default=2e-5,
+    )
+    parser.add_argument(
+        "--warmup-ratio", "--warmup",
+        dest="warmup_ratio",
+        type=float,
+        default=0.1,
+    )
+    parser.add_argument(
+        "--weight-decay", "--decay",
+        dest="weight_decay",
+        type=float,
+        default=0.01,
+    )
+    parser.add_argument(
+        "--random-seed", "--seed",
+        dest="random_seed",
+        type=int,
+        default=1234,
+    )
+
+
 def _create_pipeline(args: Namespace) -> Pipeline:
     metric: Metric = next(filter(lambda m: m.slug == args.metric, _metrics))
 
@@ -327,6 +421,11 @@ def _create_pipeline(args: Namespace) -> Pipeline:
             synonyms=args.synonyms,
             antonyms=args.antonyms,
             language=args.language,
+            sparse=args.sparse,
+            tokenizer=args.tokenizer,
+            weighting=args.weighting,
+            bm25_k1=args.bm25_k1,
+            bm25_b=args.bm25_b,
         )
     elif args.matcher == "bilstm-glove":
         from modern_talking.matchers.bilstm import BidirectionalLstmMatcher
@@ -362,6 +461,18 @@ def _create_pipeline(args: Namespace) -> Pipeline:
             early_stopping=args.early_stopping,
             random_seed=args.random_seed,
         )
+    elif args.matcher == "bi-encoder":
+        from modern_talking.matchers.bi_encoder import BiEncoderMatcher
+        matcher = BiEncoderMatcher(
+            model_name=args.model_name,
+            max_sequence_length=args.max_sequence_length,
+            batch_size=args.batch_size,
+            epochs=args.epochs,
+            learning_rate=args.learning_rate,
+            warmup_ratio=args.warmup_ratio,
+            weight_decay=args.weight_decay,
+            random_seed=args.random_seed,
+        )
     else:
         raise Exception("Invalid matcher.")
 